@@ -1,5 +1,71 @@
+from django.conf import settings
 from django.contrib import admin
-from .models import Category, Priority, Task, SubTask, Note
+from django.core.cache import cache
+from django.utils.text import slugify
+
+from . import search
+from .bulk import update_subtasks, update_tasks
+from .cache import get_version
+from .counters import COMPLETED, PROGRESS
+from .models import Category, Priority, Task, SubTask, Note, STATUS_CHOICES
+from .pagination import EstimatedCountPaginator
+from .routers import cache_timeout
+
+CHOICES_KEY = 'hanggarin:admin-choices:{}:{}:{}'
+
+
+class CachedRelatedFieldListFilter(admin.RelatedFieldListFilter):
+    """Related filter whose choices are cached until the related table changes."""
+
+    def field_choices(self, field, request, model_admin):
+        related = field.related_model._meta.model_name
+        key = CHOICES_KEY.format(model_admin.model._meta.model_name, field.name, get_version(related))
+        choices = cache.get(key)
+        if choices is None:
+            choices = list(super().field_choices(field, request, model_admin))
+            cache.set(key, choices, cache_timeout(getattr(settings, 'HANGGARIN_ADMIN_CHOICES_CACHE_TIMEOUT', 3600)))
+        return choices
+
+
+class IndexedAdminMixin:
+    """Changelist settings for the large tables.
+
+    Searches go through the full-text index and the paginator estimates the
+    row count instead of running COUNT(*) on every page.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    ordering = ('-pk',)
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search.search(queryset, search_term, ranked=False), False
+
+
+def _task_status_action(status):
+    @admin.action(description=f'Mark selected tasks {status}')
+    def action(modeladmin, request, queryset):
+        tasks, _ = update_tasks(queryset, status=status)
+        modeladmin.message_user(request, f'{tasks} task(s) marked {status}.')
+    action.__name__ = 'mark_tasks_' + slugify(status).replace('-', '_')
+    return action
+
+
+def _subtask_status_action(status):
+    @admin.action(description=f'Mark selected subtasks {status}')
+    def action(modeladmin, request, queryset):
+        count = update_subtasks(queryset, status)
+        modeladmin.message_user(request, f'{count} subtask(s) marked {status}.')
+    action.__name__ = 'mark_subtasks_' + slugify(status).replace('-', '_')
+    return action
+
+
+@admin.action(description='Mark selected tasks and their subtasks Completed')
+def complete_tasks_and_subtasks(modeladmin, request, queryset):
+    tasks, subtasks = update_tasks(queryset, status=COMPLETED, cascade=True)
+    modeladmin.message_user(request, f'{tasks} task(s) and {subtasks} subtask(s) marked {COMPLETED}.')
+
 
 class SubTaskInline(admin.TabularInline):
         model = SubTask
@@ -14,38 +80,60 @@ class NoteInline(admin.StackedInline):
 
 
 @admin.register(Task)
-class TaskAdmin(admin.ModelAdmin):
-    list_display = ('title', 'status', 'deadline', 'priority', 'category')
-    list_filter = ('status', 'priority', 'category')
+class TaskAdmin(IndexedAdminMixin, admin.ModelAdmin):
+    list_display = ('title', 'status', 'deadline', 'priority', 'category', 'progress', 'note_count')
+    list_filter = (
+        'status',
+        ('priority', CachedRelatedFieldListFilter),
+        ('category', CachedRelatedFieldListFilter),
+    )
+    list_select_related = ('priority', 'category')
     search_fields = ('title', 'description')
+    autocomplete_fields = ('priority', 'category')
+    readonly_fields = ('subtask_count', 'subtask_completed_count', 'note_count')
     inlines = [SubTaskInline, NoteInline]
+    actions = [_task_status_action(status) for status, _ in STATUS_CHOICES] + [complete_tasks_and_subtasks]
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(progress=PROGRESS)
+
+    @admin.display(description='Progress', ordering='progress')
+    def progress(self, obj):
+        return f'{obj.progress_percent}% ({obj.subtask_completed_count}/{obj.subtask_count})'
 
 
 @admin.register(SubTask)
-class SubTaskAdmin(admin.ModelAdmin):
+class SubTaskAdmin(IndexedAdminMixin, admin.ModelAdmin):
     list_display = ('title', 'status', 'parent_task_name')
     list_filter = ('status',)
+    list_select_related = ('task',)
     search_fields = ('title',)
+    autocomplete_fields = ('task',)
+    actions = [_subtask_status_action(status) for status, _ in STATUS_CHOICES]
 
-    @admin.display(description='Parent Task')
+    @admin.display(description='Parent Task', ordering='task__title')
     def parent_task_name(self, obj):
         return obj.task.title
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ('name',)
+    ordering = ('name',)
     search_fields = ('name',)
 
 @admin.register(Priority)
 class PriorityAdmin(admin.ModelAdmin):
     list_display = ('name',)
+    ordering = ('name',)
     search_fields = ('name',)
 
 
 @admin.register(Note)
-class NoteAdmin(admin.ModelAdmin):
+class NoteAdmin(IndexedAdminMixin, admin.ModelAdmin):
     list_display = ('task', 'content', 'created_at')
     list_filter = ('created_at',)
+    list_select_related = ('task',)
     search_fields = ('content',)
+    autocomplete_fields = ('task',)
     
-# Register your models here.
\ No newline at end of file
+# Register your models here.
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class HanggarinAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'HanggarinApp'
+
+    def ready(self):
+        from HanggarinApp import signals  # noqa: F401
@@ -0,0 +1,117 @@
+import gzip
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import HashedFilesMixin, ManifestStaticFilesStorage
+from django.core.files.storage import FileSystemStorage
+
+try:
+    import brotli
+except ImportError:  # optional: .br variants are skipped without it
+    brotli = None
+
+# Per-page bundles: each is concatenated from the listed static files into one
+# file at its key. Base is the chrome every page loads; pages add their own
+# through {% block bundles %} (forms bring autocomplete.js via form.media).
+BUNDLES = {
+    'css/base.bundle.css': ['css/bootstrap.min.css', 'css/ready.css', 'css/demo.css'],
+    'js/base.bundle.js': [
+        'js/core/jquery.3.2.1.min.js',
+        'js/core/popper.min.js',
+        'js/core/bootstrap.min.js',
+        'js/plugin/jquery-scrollbar/jquery.scrollbar.min.js',
+        'js/ready.js',
+    ],
+    'js/dashboard.bundle.js': [
+        'js/plugin/chartist/chartist.min.js',
+        'js/plugin/chartist/plugin/chartist-plugin-tooltip.min.js',
+        'js/dashboard.js',
+    ],
+}
+SOURCE_MAP = re.compile(r'^\s*(/\*# sourceMappingURL=.*\*/|//# sourceMappingURL=.*)$', re.MULTILINE)
+COMPRESSIBLE = ('.css', '.js', '.svg', '.json', '.txt', '.map', '.eot', '.ttf')
+
+
+def build_dir():
+    return str(getattr(settings, 'HANGGARIN_ASSET_BUILD_DIR', settings.BASE_DIR / '.assets'))
+
+
+def build_bundle(path):
+    """Write bundle ``path`` into the build directory if a source is newer."""
+    sources = [finders.find(source) for source in BUNDLES[path]]
+    missing = [source for source, found in zip(BUNDLES[path], sources) if not found]
+    if missing:
+        raise FileNotFoundError(f'Bundle {path} is missing {", ".join(missing)}.')
+    target = os.path.join(build_dir(), path)
+    if os.path.exists(target) and os.path.getmtime(target) >= max(os.path.getmtime(s) for s in sources):
+        return target
+    parts = []
+    for source in sources:
+        with open(source, encoding='utf-8') as fh:
+            # The sources' maps do not describe the bundle.
+            parts.append(SOURCE_MAP.sub('', fh.read()))
+    separator = '\n' if path.endswith('.css') else ';\n'
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp = f'{target}.{os.getpid()}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        fh.write(separator.join(parts))
+    os.replace(tmp, target)
+    return target
+
+
+class BundleFinder(finders.BaseFinder):
+    """Expose BUNDLES to runserver and collectstatic as ordinary static files."""
+
+    def check(self, **kwargs):
+        return []
+
+    def find(self, path, find_all=False, **kwargs):
+        if path not in BUNDLES:
+            return [] if find_all else None
+        target = build_bundle(path)
+        return [target] if find_all else target
+
+    def list(self, ignore_patterns):
+        storage = FileSystemStorage(location=build_dir())
+        for path in BUNDLES:
+            build_bundle(path)
+            yield path, storage
+
+
+class CompressedManifestStorage(ManifestStaticFilesStorage):
+    """Content-hashed names plus .gz (and .br with brotli) next to each text asset.
+
+    Vendored files reference source maps that are not shipped, so map comments
+    are left as they are instead of failing post-processing; only devtools
+    ever request them.
+    """
+    patterns = tuple(
+        (extension, tuple(
+            pattern for pattern in extension_patterns
+            if 'sourceMappingURL' not in (pattern[0] if isinstance(pattern, tuple) else pattern)
+        ))
+        for extension, extension_patterns in HashedFilesMixin.patterns
+    )
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for hashed_name in set(self.hashed_files.values()):
+            if hashed_name.endswith(COMPRESSIBLE):
+                self.compress(hashed_name)
+
+    def compress(self, name):
+        path = self.path(name)
+        with open(path, 'rb') as fh:
+            data = fh.read()
+        variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(data)))
+        for suffix, compressed in variants:
+            # Skip variants that would not save anything worth a lookup.
+            if len(compressed) < len(data) * 0.95:
+                with open(path + suffix, 'wb') as fh:
+                    fh.write(compressed)
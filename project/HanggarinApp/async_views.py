@@ -0,0 +1,103 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.views import View
+from django.views.generic.list import MultipleObjectMixin
+
+from HanggarinApp.routers import cache_timeout
+from HanggarinApp.stats import aget_dashboard_stats
+from HanggarinApp.views import (
+    HomePageView, CategoryListView, PriorityListView, TaskListView, SubTaskListView, NoteListView,
+)
+
+# Async-native versions of the dashboard and list views, served by
+# projectsite.asgi_urls. Everything up to the response (user, validators,
+# cache, counts and the page of rows) is awaited instead of holding a worker
+# thread; the response is rendered from already-fetched rows.
+
+
+class AsyncViewMixin:
+    """Async dispatch for the LoginRequired + Conditional views."""
+
+    async def dispatch(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return self.handle_no_permission()
+        if request.method not in ('GET', 'HEAD'):
+            return await View.dispatch(self, request, *args, **kwargs)
+        etag, last_modified = await self.aget_validators()
+        response = self.not_modified(request, etag, last_modified)
+        if response is None:
+            response = await self.get(request, *args, **kwargs)
+        return self.set_validators(response, etag, last_modified)
+
+
+class AsyncListMixin(AsyncViewMixin):
+    prefetched_page = None
+    row_count = None
+
+    async def get(self, request, *args, **kwargs):
+        key = await self.aget_table_cache_key()
+        table = await cache.aget(key)
+        self.object_list = self.model.objects.none()
+        if table is None:
+            self.object_list = self.get_queryset()
+            self.prefetched_page = await self.apaginate_queryset(
+                self.object_list, self.get_paginate_by(self.object_list),
+            )
+            table = render_to_string(self.table_template_name, self.get_context_data(), request)
+            await cache.aset(key, table, cache_timeout(getattr(settings, 'HANGGARIN_TABLE_CACHE_TIMEOUT', 300)))
+        return self.render_to_response({'view': self, 'table': table, **self.get_page_context()})
+
+    async def apaginate_queryset(self, queryset, page_size):
+        if self.use_cursor_pagination():
+            ordering = self.get_cursor_ordering(queryset)
+            if ordering is not None:
+                page = await self.apaginate_by_cursor(queryset, ordering, page_size)
+                return (None, page, page.object_list, page.has_other_pages())
+        self.row_count = await queryset.acount()
+        # Django's page-number handling, against the count fetched above.
+        paginator, page, rows, is_paginated = MultipleObjectMixin.paginate_queryset(self, queryset, page_size)
+        page.object_list = [obj async for obj in rows]
+        return paginator, page, page.object_list, is_paginated
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.prefetched_page is not None:
+            return self.prefetched_page
+        return super().paginate_queryset(queryset, page_size)
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        paginator = super().get_paginator(queryset, per_page, **kwargs)
+        if self.row_count is not None:
+            paginator.count = self.row_count
+        return paginator
+
+
+class AsyncHomePageView(AsyncViewMixin, HomePageView):
+    async def get(self, request, *args, **kwargs):
+        # The five table aggregates run concurrently on a cache miss.
+        self.stats = await aget_dashboard_stats()
+        return self.render_to_response(self.get_context_data(**kwargs))
+
+    def get_stats(self):
+        return self.stats
+
+
+class AsyncCategoryListView(AsyncListMixin, CategoryListView):
+    pass
+
+
+class AsyncPriorityListView(AsyncListMixin, PriorityListView):
+    pass
+
+
+class AsyncTaskListView(AsyncListMixin, TaskListView):
+    pass
+
+
+class AsyncSubTaskListView(AsyncListMixin, SubTaskListView):
+    pass
+
+
+class AsyncNoteListView(AsyncListMixin, NoteListView):
+    pass
@@ -0,0 +1,107 @@
+from contextlib import contextmanager
+
+from django.db import connections, router, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+from HanggarinApp import rollups, search
+from HanggarinApp.cache import bump_models, bump_version
+from HanggarinApp.counters import COMPLETED, recount_task_counters
+from HanggarinApp.models import Task, SubTask
+from HanggarinApp.stats import DASHBOARD_NAMESPACE
+
+# Each change is one UPDATE ... WHERE pk IN (<selection>). update() sends no
+# signals, so the rollups are diffed over the same selection before and after
+# it, and the counters and search index follow from it too. The selection is
+# frozen into a temporary table first: its filters (status, search matches)
+# may no longer hold for the rows once they have changed.
+
+
+@contextmanager
+def _frozen(queryset):
+    """Yield a queryset over the pks ``queryset`` selects right now, copied
+    in one INSERT ... SELECT into a temporary table that outlives the change.
+
+    Use inside transaction.atomic(): on an error the rollback drops the table.
+    """
+    model = queryset.model
+    alias = router.db_for_write(model)
+    connection = connections[alias]
+    table = connection.ops.quote_name(f'hanggarin_bulk_{model._meta.model_name}')
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'CREATE TEMPORARY TABLE {table} AS {sql}', params)
+    yield model.objects.using(alias).filter(pk__in=RawSQL(f'SELECT * FROM {table}', []))
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE {table}')
+
+
+def _completion(status, now):
+    """The completed_at to write alongside ``status``; rows already completed
+    keep theirs."""
+    if status != COMPLETED:
+        return None
+    return Case(When(status=COMPLETED, then=F('completed_at')), default=Value(now))
+
+
+def _update(rows, deltas, **changes):
+    """UPDATE ``rows`` once, diffing their rollup contributions around it."""
+    rollups.queryset_deltas(rows, -1, deltas)
+    count = rows.update(**changes)
+    if count:
+        rollups.queryset_deltas(rows, 1, deltas)
+    return count
+
+
+def update_tasks(queryset, status=None, priority=None, category=None, cascade=False):
+    """Apply a status and/or priority/category change to every selected task.
+
+    With ``cascade`` and ``status='Completed'`` the subtasks of the selected
+    tasks are completed too. Returns ``(tasks, subtasks)`` rows changed.
+    """
+    changes = {}
+    if status:
+        changes['status'] = status
+    if priority is not None:
+        changes['priority'] = priority
+    if category is not None:
+        changes['category'] = category
+    if not changes:
+        return 0, 0
+    now = timezone.now()
+    subtasks = 0
+    if status:
+        changes['completed_at'] = _completion(status, now)
+    deltas = rollups.new_deltas()
+    with transaction.atomic(using=router.db_for_write(Task)), _frozen(queryset) as selected:
+        if cascade and status == COMPLETED:
+            pending = SubTask.objects.filter(task__in=selected).exclude(status=COMPLETED)
+            with _frozen(pending) as pending:
+                subtasks = _update(pending, deltas, status=COMPLETED, completed_at=now, updated_at=now)
+                if subtasks:
+                    search.reindex(SubTask, pending)
+        tasks = _update(selected, deltas, updated_at=now, **changes)
+        rollups.apply(deltas)
+        if subtasks:
+            recount_task_counters(selected)
+        search.reindex(Task, selected)
+    bump_version(DASHBOARD_NAMESPACE)
+    bump_models(Task, SubTask)
+    return tasks, subtasks
+
+
+def update_subtasks(queryset, status):
+    """Move every selected subtask to ``status``; returns the rows changed."""
+    now = timezone.now()
+    deltas = rollups.new_deltas()
+    with transaction.atomic(using=router.db_for_write(SubTask)), _frozen(queryset.exclude(status=status)) as selected:
+        count = _update(selected, deltas, status=status, completed_at=_completion(status, now), updated_at=now)
+        if count:
+            rollups.apply(deltas)
+            recount_task_counters(Task.objects.filter(pk__in=selected.values('task_id')))
+            search.reindex(SubTask, selected)
+    if count:
+        bump_version(DASHBOARD_NAMESPACE)
+        bump_models(SubTask, Task)
+    return count
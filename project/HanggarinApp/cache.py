@@ -0,0 +1,86 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+from HanggarinApp.routers import cache_timeout
+
+VERSION_KEY = 'hanggarin:version:{}'
+TABLE_KEY = 'hanggarin:table:{}:{}:{}'
+
+
+def get_version(namespace):
+    key = VERSION_KEY.format(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key, 1)
+    return version
+
+
+async def aget_version(namespace):
+    key = VERSION_KEY.format(namespace)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, 1, timeout=None)
+        version = await cache.aget(key, 1)
+    return version
+
+
+def bump_version(*namespaces):
+    for namespace in namespaces:
+        key = VERSION_KEY.format(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 2, timeout=None)
+
+
+def bump_models(*models):
+    """Bump the namespaces of models written without signals (bulk/update())."""
+    bump_version(*(model._meta.model_name for model in models))
+
+
+class CachedTableMixin:
+    """Serve a ListView's rendered table from cache until its data changes.
+
+    The table (rows and pagination) lives in ``table_template_name`` and is
+    keyed by the request's q/sort_by/page/cursor plus the version of every
+    namespace in ``cache_namespaces``; a warm hit never touches the ORM.
+    """
+    table_template_name = None
+    cache_namespaces = ()
+
+    def get_table_cache_key(self):
+        return self.table_cache_key([get_version(namespace) for namespace in self.cache_namespaces])
+
+    async def aget_table_cache_key(self):
+        return self.table_cache_key([await aget_version(namespace) for namespace in self.cache_namespaces])
+
+    def table_cache_key(self, versions):
+        params = urlencode([
+            ('q', self.request.GET.get('q', '')),
+            ('sort_by', self.get_ordering() or ''),
+            ('page', self.request.GET.get(self.page_kwarg, '')),
+            ('cursor', self.request.GET.get('cursor', '') if self.use_cursor_pagination() else ''),
+            ('keyset', int(bool(self.use_cursor_pagination()))),
+        ])
+        digest = hashlib.md5(params.encode()).hexdigest()
+        return TABLE_KEY.format(self.model._meta.model_name, '.'.join(str(v) for v in versions), digest)
+
+    def get(self, request, *args, **kwargs):
+        key = self.get_table_cache_key()
+        table = cache.get(key)
+        # Lazy and never evaluated; ListView only inspects it for template names.
+        self.object_list = self.model.objects.none()
+        if table is None:
+            self.object_list = self.get_queryset()
+            table = render_to_string(self.table_template_name, self.get_context_data(), request)
+            cache.set(key, table, cache_timeout(getattr(settings, 'HANGGARIN_TABLE_CACHE_TIMEOUT', 300)))
+        return self.render_to_response({'view': self, 'table': table, **self.get_page_context()})
+
+    def get_page_context(self):
+        """Context for the page around the table; must not query the rows."""
+        return {'q': self.request.GET.get('q', ''), 'sort_by': self.get_ordering()}
@@ -0,0 +1,108 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from HanggarinApp.cache import aget_version, get_version
+from HanggarinApp.routers import cache_timeout
+from HanggarinApp.stats import DASHBOARD_NAMESPACE, aget_dashboard_stats, get_dashboard_stats
+
+VALIDATOR_KEY = 'hanggarin:validator:{}'
+
+
+class ConditionalGetMixin:
+    """Answer GET/HEAD with 304 Not Modified when the page has not changed.
+
+    Subclasses return ``(parts, last_modified)`` from ``get_validator_state``.
+    The ETag hashes those parts with the user (the page chrome shows who is
+    logged in) and the session and CSRF secret, so a 304 never serves another
+    user's page. Clients must revalidate on every use.
+    """
+
+    def get_validator_state(self):
+        raise NotImplementedError
+
+    async def aget_validator_state(self):
+        raise NotImplementedError
+
+    def get_validators(self):
+        return self.validators(*self.get_validator_state())
+
+    async def aget_validators(self):
+        return self.validators(*await self.aget_validator_state())
+
+    def validators(self, parts, last_modified):
+        user = self.request.user
+        # Flash messages are part of the page; peek without consuming them.
+        storage = messages.get_messages(self.request)
+        pending = [str(message) for message in storage]
+        storage.used = False
+        # Forms on the page embed a token derived from the CSRF secret, which
+        # login rotates along with the session: a page cached under an earlier
+        # session must not be revalidated.
+        get_token(self.request)
+        secret = self.request.META['CSRF_COOKIE']
+        parts = [user.pk, user.get_username(), self.request.session.session_key, secret, *pending, *parts]
+        digest = hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest()
+        return quote_etag(digest), last_modified
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        etag, last_modified = self.get_validators()
+        response = self.not_modified(request, etag, last_modified)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        return self.set_validators(response, etag, last_modified)
+
+    def not_modified(self, request, etag, last_modified):
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+    def set_validators(self, response, etag, last_modified):
+        if response.status_code in (200, 304):
+            response.headers['ETag'] = etag
+            if last_modified is not None:
+                response.headers['Last-Modified'] = http_date(int(last_modified.timestamp()))
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class ConditionalListMixin(ConditionalGetMixin):
+    """Validators for the cached list views: newest updated_at and row count of
+    the filtered queryset, cached alongside the rendered table."""
+
+    def get_validator_state(self):
+        table_key = self.get_table_cache_key()
+        key = VALIDATOR_KEY.format(table_key)
+        state = cache.get(key)
+        if state is None:
+            state = self.get_queryset().order_by().aggregate(last=Max('updated_at'), count=Count('pk'))
+            cache.set(key, state, cache_timeout(getattr(settings, 'HANGGARIN_TABLE_CACHE_TIMEOUT', 300)))
+        return [table_key, state['count']], state['last']
+
+    async def aget_validator_state(self):
+        table_key = await self.aget_table_cache_key()
+        key = VALIDATOR_KEY.format(table_key)
+        state = await cache.aget(key)
+        if state is None:
+            state = await self.get_queryset().order_by().aaggregate(last=Max('updated_at'), count=Count('pk'))
+            await cache.aset(key, state, cache_timeout(getattr(settings, 'HANGGARIN_TABLE_CACHE_TIMEOUT', 300)))
+        return [table_key, state['count']], state['last']
+
+
+class ConditionalDashboardMixin(ConditionalGetMixin):
+    def get_validator_state(self):
+        return self.dashboard_validator_state(get_dashboard_stats(), get_version(DASHBOARD_NAMESPACE))
+
+    async def aget_validator_state(self):
+        return self.dashboard_validator_state(await aget_dashboard_stats(), await aget_version(DASHBOARD_NAMESPACE))
+
+    def dashboard_validator_state(self, stats, version):
+        parts = [version] + [stats[key] for key in sorted(stats)]
+        return parts, stats.get('last_modified')
@@ -0,0 +1,57 @@
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from HanggarinApp.models import Task, SubTask, Note
+
+COMPLETED = 'Completed'
+
+# Completion percentage from the maintained counters, for annotate()/order_by().
+PROGRESS = Case(
+    When(subtask_count=0, then=Value(0)),
+    default=F('subtask_completed_count') * 100 / F('subtask_count'),
+    output_field=IntegerField(),
+)
+
+
+def adjust_task_counters(task_id, subtasks=0, completed=0, notes=0):
+    updates = {}
+    if subtasks:
+        updates['subtask_count'] = F('subtask_count') + subtasks
+    if completed:
+        updates['subtask_completed_count'] = F('subtask_completed_count') + completed
+    if notes:
+        updates['note_count'] = F('note_count') + notes
+    if updates:
+        Task.objects.filter(pk=task_id).update(updated_at=timezone.now(), **updates)
+
+
+def _count(model, **filters):
+    rows = (
+        model.objects.filter(task=OuterRef('pk'), **filters)
+        .order_by().values('task').annotate(n=Count('pk')).values('n')
+    )
+    return Coalesce(Subquery(rows), 0)
+
+
+def recount_task_counters(queryset=None):
+    """Recompute the counters from the child tables in one UPDATE."""
+    if queryset is None:
+        queryset = Task.objects.all()
+    return queryset.update(
+        subtask_count=_count(SubTask),
+        subtask_completed_count=_count(SubTask, status=COMPLETED),
+        note_count=_count(Note),
+    )
+
+
+def drifted_tasks():
+    return Task.objects.annotate(
+        actual_subtasks=_count(SubTask),
+        actual_completed=_count(SubTask, status=COMPLETED),
+        actual_notes=_count(Note),
+    ).filter(
+        ~Q(subtask_count=F('actual_subtasks'))
+        | ~Q(subtask_completed_count=F('actual_completed'))
+        | ~Q(note_count=F('actual_notes'))
+    )
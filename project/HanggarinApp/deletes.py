@@ -0,0 +1,126 @@
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Count, Sum
+from django.db.models.signals import post_delete, pre_delete
+from django.utils import timezone
+
+from HanggarinApp import rollups, search, signals
+from HanggarinApp.cache import bump_models, bump_version
+from HanggarinApp.models import Category, Priority, Task, SubTask, Note
+from HanggarinApp.stats import DASHBOARD_NAMESPACE
+from HanggarinApp.sync import record_tombstones
+
+# Deleting a Category or Priority cascades to its tasks and from there to
+# their subtasks and notes; Django's Collector would load every one of those
+# rows to send post_delete for it. The handlers this app connects (caches,
+# search index, counters, tombstones, rollups) all have set-based equivalents,
+# so the children are deleted with one statement per table instead and only
+# the root goes through Model.delete().
+HANDLED_RECEIVERS = {
+    signals.invalidate_dashboard, signals.unindex, signals.count_subtask_delete, signals.count_note_delete,
+    signals.record_tombstone, signals.rollup_delete,
+}
+
+
+def child_tasks(obj):
+    """The tasks deleted along with ``obj`` (none when ``obj`` is a task)."""
+    if isinstance(obj, Category):
+        return Task.objects.filter(category=obj)
+    if isinstance(obj, Priority):
+        return Task.objects.filter(priority=obj)
+    return Task.objects.none()
+
+
+def tree_size(obj):
+    """Rows deleting ``obj`` removes, read off the task counters in one query."""
+    if isinstance(obj, Task):
+        size = {'tasks': 0, 'subtasks': obj.subtask_count, 'notes': obj.note_count}
+    else:
+        totals = child_tasks(obj).aggregate(tasks=Count('pk'), subtasks=Sum('subtask_count'), notes=Sum('note_count'))
+        size = {name: value or 0 for name, value in totals.items()}
+    size['total'] = 1 + size['tasks'] + size['subtasks'] + size['notes']
+    return size
+
+
+def _signals_handled(*models):
+    for model in models:
+        if pre_delete.has_listeners(model):
+            return False
+        # Signal has no public way to list receivers; _live_receivers() returns
+        # (sync, async) lists since Django 5.0, the oldest version supported.
+        sync_receivers, async_receivers = post_delete._live_receivers(model)
+        if not set(sync_receivers) | set(async_receivers) <= HANDLED_RECEIVERS:
+            return False
+    return True
+
+
+def _purge(queryset, now):
+    """Tombstone, unindex, uncount and delete ``queryset`` without loading a row."""
+    model = queryset.model
+    record_tombstones(queryset, now)
+    if model in rollups.FIELDS:
+        rollups.remove(queryset)
+    if model in search.DOCUMENTS:
+        search.remove(model, queryset)
+    connection = connections[router.db_for_write(model)]
+    qn = connection.ops.quote_name
+    sql, params = queryset.values('id').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {qn(model._meta.db_table)} WHERE {qn("id")} IN ({sql})', params)
+        return cursor.rowcount
+
+
+def delete_branches(tasks, include_tasks=True):
+    """Delete the subtasks and notes of ``tasks`` (a queryset), and with
+    ``include_tasks`` the tasks themselves, in one transaction."""
+    now = timezone.now()
+    parents = tasks.values('pk')
+    deleted = 0
+    with transaction.atomic(using=router.db_for_write(Task)):
+        deleted += _purge(Note.objects.filter(task__in=parents), now)
+        deleted += _purge(SubTask.objects.filter(task__in=parents), now)
+        if include_tasks:
+            deleted += _purge(Task.objects.filter(pk__in=parents), now)
+    return deleted
+
+
+def delete_tree(obj):
+    """Delete ``obj`` and everything that cascades from it; returns the row count."""
+    if not _signals_handled(Task, SubTask, Note):
+        # Someone else listens for these deletes: let the Collector send them.
+        return obj.delete()[0]
+    with transaction.atomic(using=router.db_for_write(type(obj))):
+        if isinstance(obj, Task):
+            deleted = delete_branches(Task.objects.filter(pk=obj.pk), include_tasks=False)
+        else:
+            deleted = delete_branches(child_tasks(obj))
+        # Nothing is left to cascade, so this only sends obj's own signals.
+        deleted += obj.delete()[0]
+    bump_version(DASHBOARD_NAMESPACE)
+    bump_models(Task, SubTask, Note)
+    return deleted
+
+
+def delete_in_chunks(obj, report=None):
+    """Delete ``obj``'s tasks HANGGARIN_DELETE_CHUNK_SIZE at a time, each chunk
+    in its own short transaction so other writers get the lock in between,
+    then ``obj`` itself. ``report(done, total)`` is called after each chunk."""
+    report = report or (lambda done, total: None)
+    chunk_size = settings.HANGGARIN_DELETE_CHUNK_SIZE
+    total = tree_size(obj)['total']
+    done = 0
+    report(done, total)
+    if _signals_handled(Task, SubTask, Note):
+        # From the primary: a replica could keep returning deleted ids.
+        tasks = child_tasks(obj).using(router.db_for_write(Task)).order_by('pk')
+        while True:
+            chunk = list(tasks.values_list('pk', flat=True)[:chunk_size])
+            if not chunk:
+                break
+            done += delete_branches(Task.objects.filter(pk__in=chunk))
+            bump_version(DASHBOARD_NAMESPACE)
+            bump_models(Task, SubTask, Note)
+            report(done, max(total, done))
+    done += delete_tree(obj)
+    report(done, max(total, done))
+    return done
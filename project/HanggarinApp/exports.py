@@ -0,0 +1,115 @@
+import csv
+import json
+import zlib
+
+from django.conf import settings
+from django.db.models import Prefetch
+
+from HanggarinApp.models import SubTask, Note
+
+FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+CSV_HEADER = [
+    'record', 'id', 'task_id', 'title', 'description', 'status', 'deadline',
+    'priority', 'category', 'content', 'created_at', 'updated_at',
+]
+
+
+class _Echo:
+    """File-like object for csv.writer that hands the line back."""
+
+    def write(self, value):
+        return value
+
+
+def _iso(value):
+    return value.isoformat() if value else ''
+
+
+def export_rows(queryset, chunk_size=None):
+    """Iterate ``queryset`` in chunks with each chunk's children prefetched.
+
+    Memory stays bounded by ``chunk_size`` tasks plus their subtasks/notes.
+    """
+    chunk_size = chunk_size or getattr(settings, 'HANGGARIN_EXPORT_CHUNK_SIZE', 2000)
+    ordering = queryset.query.order_by or queryset.model._meta.ordering
+    if 'pk' not in ordering and '-pk' not in ordering:
+        # A stable order, so chunk boundaries never skip or repeat a row.
+        queryset = queryset.order_by(*ordering, 'pk')
+    queryset = queryset.select_related('priority', 'category').prefetch_related(
+        Prefetch('subtasks', queryset=SubTask.objects.order_by('pk')),
+        Prefetch('notes', queryset=Note.objects.order_by('pk')),
+    )
+    return queryset.iterator(chunk_size=chunk_size)
+
+
+def task_record(task):
+    return {
+        'id': task.pk,
+        'title': task.title,
+        'description': task.description,
+        'status': task.status,
+        'deadline': _iso(task.deadline),
+        'priority': task.priority.name,
+        'category': task.category.name,
+        'created_at': _iso(task.created_at),
+        'updated_at': _iso(task.updated_at),
+        'subtasks': [
+            {'id': sub.pk, 'title': sub.title, 'status': sub.status,
+             'created_at': _iso(sub.created_at), 'updated_at': _iso(sub.updated_at)}
+            for sub in task.subtasks.all()
+        ],
+        'notes': [
+            {'id': note.pk, 'content': note.content,
+             'created_at': _iso(note.created_at), 'updated_at': _iso(note.updated_at)}
+            for note in task.notes.all()
+        ],
+    }
+
+
+def stream_jsonl(tasks):
+    for task in tasks:
+        yield json.dumps(task_record(task), ensure_ascii=False) + '\n'
+
+
+def stream_csv(tasks):
+    # One row per task followed by a row per child, told apart by ``record``.
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_HEADER)
+    for task in tasks:
+        record = task_record(task)
+        yield writer.writerow([
+            'task', task.pk, task.pk, record['title'], record['description'], record['status'],
+            record['deadline'], record['priority'], record['category'], '',
+            record['created_at'], record['updated_at'],
+        ])
+        for sub in record['subtasks']:
+            yield writer.writerow([
+                'subtask', sub['id'], task.pk, sub['title'], '', sub['status'], '', '', '', '',
+                sub['created_at'], sub['updated_at'],
+            ])
+        for note in record['notes']:
+            yield writer.writerow([
+                'note', note['id'], task.pk, '', '', '', '', '', '', note['content'],
+                note['created_at'], note['updated_at'],
+            ])
+
+
+def gzip_stream(chunks, level=6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_tasks(queryset, fmt='csv', compress=False, chunk_size=None):
+    """Yield the export of ``queryset`` as str chunks, or bytes when compressed."""
+    if fmt not in FORMATS:
+        raise ValueError(f'Unknown export format {fmt!r}; use one of {", ".join(FORMATS)}.')
+    tasks = export_rows(queryset, chunk_size)
+    chunks = stream_csv(tasks) if fmt == 'csv' else stream_jsonl(tasks)
+    return gzip_stream(chunks) if compress else chunks
@@ -1,6 +1,8 @@
 from django.forms import ModelForm
 from django import forms
-from HanggarinApp.models import Category, Note, Priority, Task, SubTask
+from HanggarinApp.imports import FORMATS as IMPORT_FORMATS
+from HanggarinApp.models import Category, Note, Priority, Task, SubTask, STATUS_CHOICES
+from HanggarinApp.widgets import AutocompleteSelect
 
 class CategoryForm(ModelForm):
     class Meta:
@@ -10,7 +12,8 @@ class CategoryForm(ModelForm):
 class NoteForm(ModelForm):
     class Meta:
         model = Note
-        fields = "__all__"
+        fields = ['task', 'content']
+        widgets = {'task': AutocompleteSelect('task-autocomplete')}
 
 class PriorityForm(ModelForm):
     class Meta:
@@ -20,9 +23,83 @@ class PriorityForm(ModelForm):
 class SubTaskForm(ModelForm):
     class Meta:
         model = SubTask
-        fields = "__all__"
+        fields = ['task', 'title', 'status']
+        widgets = {'task': AutocompleteSelect('task-autocomplete')}
 
 class TaskForm(ModelForm):
     class Meta:
         model = Task
-        fields = "__all__"
\ No newline at end of file
+        fields = ['title', 'description', 'status', 'deadline', 'priority', 'category']
+        widgets = {
+            # The browser's own picker; no date-picker script to download.
+            'deadline': forms.DateTimeInput(attrs={'type': 'datetime-local'}, format='%Y-%m-%dT%H:%M'),
+            'priority': AutocompleteSelect('priority-autocomplete'),
+            'category': AutocompleteSelect('category-autocomplete'),
+        }
+
+
+class ImportForm(forms.Form):
+    file = forms.FileField()
+    format = forms.ChoiceField(
+        choices=[('', 'From file extension')] + [(fmt, fmt.upper()) for fmt in IMPORT_FORMATS],
+        required=False,
+    )
+
+    def clean(self):
+        cleaned = super().clean()
+        upload = cleaned.get('file')
+        if upload and not cleaned.get('format'):
+            fmt = upload.name.rsplit('.', 1)[-1].lower()
+            if fmt not in IMPORT_FORMATS:
+                raise forms.ValidationError('Cannot tell the format from the file name; pick one.')
+            cleaned['format'] = fmt
+        return cleaned
+
+
+class IdListField(forms.Field):
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        try:
+            return [int(pk) for pk in value or []]
+        except (TypeError, ValueError):
+            raise forms.ValidationError('Invalid selection.')
+
+
+class BulkSelectionForm(forms.Form):
+    ids = IdListField(required=False)
+    scope = forms.ChoiceField(
+        choices=[('selected', 'Selected rows'), ('all', 'Everything matching the search')],
+        initial='selected',
+    )
+    status = forms.ChoiceField(choices=[('', 'Keep status')] + list(STATUS_CHOICES), required=False)
+
+    def clean(self):
+        cleaned = super().clean()
+        if cleaned.get('scope') == 'selected' and not cleaned.get('ids'):
+            raise forms.ValidationError('Select at least one row.')
+        return cleaned
+
+
+class BulkTaskForm(BulkSelectionForm):
+    priority = forms.ModelChoiceField(
+        Priority.objects.all(), required=False, widget=AutocompleteSelect('priority-autocomplete'),
+    )
+    category = forms.ModelChoiceField(
+        Category.objects.all(), required=False, widget=AutocompleteSelect('category-autocomplete'),
+    )
+    cascade = forms.BooleanField(required=False, label='Also complete their subtasks')
+
+    def clean(self):
+        cleaned = super().clean()
+        if not (cleaned.get('status') or cleaned.get('priority') or cleaned.get('category')):
+            raise forms.ValidationError('Choose a status, priority or category to apply.')
+        return cleaned
+
+
+class BulkSubTaskForm(BulkSelectionForm):
+    def clean(self):
+        cleaned = super().clean()
+        if not cleaned.get('status'):
+            raise forms.ValidationError('Choose a status to apply.')
+        return cleaned
@@ -0,0 +1,240 @@
+import csv
+import json
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from HanggarinApp import rollups, search
+from HanggarinApp.cache import bump_models, bump_version
+from HanggarinApp.counters import recount_task_counters
+from HanggarinApp.models import Category, CompletionMixin, Priority, Task, SubTask, Note
+from HanggarinApp.stats import DASHBOARD_NAMESPACE
+
+# Reads the layout written by HanggarinApp.exports: JSONL with children nested
+# under each task, or CSV with a ``record`` column and children pointing at
+# their task's ``task_id`` from the same file.
+FORMATS = ('csv', 'jsonl')
+TASK_FIELDS = ('title', 'description', 'status', 'deadline')
+SUBTASK_FIELDS = ('title', 'status')
+NOTE_FIELDS = ('content',)
+MAX_ERRORS = 1000
+
+
+@dataclass
+class ImportResult:
+    tasks: int = 0
+    subtasks: int = 0
+    notes: int = 0
+    categories: int = 0
+    priorities: int = 0
+    errors: list = field(default_factory=list)
+    error_count: int = 0
+
+    def add_error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append((line, message))
+
+
+def _text(value):
+    return '' if value is None else str(value).strip()
+
+
+class LookupCache:
+    """Name -> id for Category/Priority, creating missing names.
+
+    Names are not unique; a name always resolves to its oldest row.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        # Newest first, so the oldest row of a repeated name is the one kept.
+        self.ids = dict(model.objects.order_by('-pk').values_list('name', 'id'))
+        self.created = 0
+
+    def resolve(self, names):
+        # A handful of new names per import. Look each up again first: another
+        # import may have created it since this one read the lookups.
+        for name in sorted(name for name in names if name not in self.ids):
+            pk = self.model.objects.filter(name=name).order_by('pk').values_list('pk', flat=True).first()
+            if pk is None:
+                pk = self.model.objects.create(name=name).pk
+                self.created += 1
+            self.ids[name] = pk
+
+    def __getitem__(self, name):
+        return self.ids[name]
+
+
+class TaskImporter:
+    """Validate and bulk-insert tasks with their subtasks and notes.
+
+    Rows are processed ``batch_size`` tasks at a time, each batch in its own
+    transaction; a bad row is reported with its line number and skipped.
+    """
+
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size or getattr(settings, 'HANGGARIN_IMPORT_BATCH_SIZE', 2000)
+        self.result = ImportResult()
+        self.categories = LookupCache(Category)
+        self.priorities = LookupCache(Priority)
+        # Source task id -> new pk, so CSV children can follow their task
+        # across batch boundaries.
+        self.task_ids = {}
+
+    def clean(self, model, names, record, line):
+        values = {}
+        for name in names:
+            raw = record.get(name)
+            model_field = model._meta.get_field(name)
+            if raw in (None, '') and model_field.null:
+                values[name] = None
+                continue
+            try:
+                value = model_field.clean(_text(raw) if name != 'deadline' else raw, None)
+            except ValidationError as exc:
+                self.result.add_error(line, f'{model.__name__} {name}: {" ".join(exc.messages)}')
+                return None
+            if name == 'deadline' and value is not None and timezone.is_naive(value):
+                value = timezone.make_aware(value)
+            values[name] = value
+        return values
+
+    def build_task(self, record, line):
+        values = self.clean(Task, TASK_FIELDS, record, line)
+        if values is None:
+            return None
+        for name in ('priority', 'category'):
+            if not _text(record.get(name)):
+                self.result.add_error(line, f'Task {name}: This field cannot be blank.')
+                return None
+        values['priority_name'] = _text(record['priority'])[:100]
+        values['category_name'] = _text(record['category'])[:100]
+        return values
+
+    def run(self, records):
+        """Import ``records``, an iterable of (line, kind, record) tuples."""
+        tasks, children = [], []
+        for line, kind, record in records:
+            if kind == 'task':
+                task = self.build_task(record, line)
+                if task is None:
+                    continue
+                task['source_id'] = _text(record.get('id'))
+                tasks.append((line, task))
+                for sub in record.get('subtasks') or []:
+                    children.append((line, 'subtask', sub, task))
+                for note in record.get('notes') or []:
+                    children.append((line, 'note', note, task))
+            elif kind in ('subtask', 'note'):
+                children.append((line, kind, record, None))
+            elif kind == 'invalid':
+                self.result.add_error(line, record.get('error') or 'Expected a JSON object.')
+                continue
+            else:
+                self.result.add_error(line, f'Unknown record type {kind!r}.')
+                continue
+            if len(tasks) >= self.batch_size or len(children) >= self.batch_size * 10:
+                self.flush(tasks, children)
+                tasks, children = [], []
+        self.flush(tasks, children)
+        bump_version(DASHBOARD_NAMESPACE)
+        bump_models(Category, Priority, Task, SubTask, Note)
+        # Child rows are checked at flush time, after later task rows.
+        self.result.errors.sort(key=lambda error: error[0])
+        self.result.categories = self.categories.created
+        self.result.priorities = self.priorities.created
+        return self.result
+
+    def insert(self, model, objs):
+        """bulk_create() ``objs`` with the completed_at save() would have
+        stamped; returns their new pks."""
+        for obj in objs:
+            if isinstance(obj, CompletionMixin):
+                obj.stamp_completion()
+        model.objects.bulk_create(objs, batch_size=self.batch_size)
+        return [obj.pk for obj in objs]
+
+    def flush(self, tasks, children):
+        if not tasks and not children:
+            return
+        with transaction.atomic():
+            self.categories.resolve({task['category_name'] for _, task in tasks})
+            self.priorities.resolve({task['priority_name'] for _, task in tasks})
+            objs = [
+                Task(
+                    category_id=self.categories[task['category_name']],
+                    priority_id=self.priorities[task['priority_name']],
+                    **{name: task[name] for name in TASK_FIELDS},
+                )
+                for _, task in tasks
+            ]
+            self.insert(Task, objs)
+            for (_, task), obj in zip(tasks, objs):
+                task['pk'] = obj.pk
+                if task['source_id']:
+                    self.task_ids[task['source_id']] = obj.pk
+
+            subtasks, notes = [], []
+            for line, kind, record, parent in children:
+                task_id = parent['pk'] if parent else self.task_ids.get(_text(record.get('task_id')))
+                if task_id is None:
+                    self.result.add_error(line, f'{kind.capitalize()} refers to unknown task {record.get("task_id")!r}.')
+                    continue
+                model, names, bucket = (
+                    (SubTask, SUBTASK_FIELDS, subtasks) if kind == 'subtask' else (Note, NOTE_FIELDS, notes)
+                )
+                values = self.clean(model, names, record, line)
+                if values is not None:
+                    bucket.append(model(task_id=task_id, **values))
+            subtask_pks = self.insert(SubTask, subtasks)
+            note_pks = self.insert(Note, notes)
+
+            # Neither path sends signals, so counters, the search index and
+            # the rollups are brought up to date once per batch.
+            touched = {obj.pk for obj in objs} | {child.task_id for child in subtasks + notes}
+            if subtasks or notes:
+                recount_task_counters(Task.objects.filter(pk__in=touched))
+            search.reindex(Task, [obj.pk for obj in objs])
+            deltas = rollups.new_deltas()
+            if objs:
+                rollups.queryset_deltas(Task.objects.filter(pk__in=[obj.pk for obj in objs]), 1, deltas)
+            for model, pks in ((SubTask, subtask_pks), (Note, note_pks)):
+                if pks:
+                    search.reindex(model, pks)
+                    rollups.queryset_deltas(model.objects.filter(pk__in=pks), 1, deltas)
+            rollups.apply(deltas)
+
+        self.result.tasks += len(objs)
+        self.result.subtasks += len(subtasks)
+        self.result.notes += len(notes)
+
+
+def read_records(stream, fmt):
+    """Yield (line, kind, record) from a text stream in ``fmt``."""
+    if fmt == 'jsonl':
+        for line, text in enumerate(stream, start=1):
+            if not text.strip():
+                continue
+            try:
+                record = json.loads(text)
+            except ValueError as exc:
+                yield line, 'invalid', {'error': str(exc)}
+                continue
+            if not isinstance(record, dict):
+                yield line, 'invalid', {}
+                continue
+            yield line, 'task', record
+    elif fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, _text(record.get('record')) or 'task', record
+    else:
+        raise ValueError(f'Unknown import format {fmt!r}; use one of {", ".join(FORMATS)}.')
+
+
+def import_tasks(stream, fmt, batch_size=None):
+    return TaskImporter(batch_size).run(read_records(stream, fmt))
@@ -0,0 +1,322 @@
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connections, router, transaction
+from django.db.models import F, TextField, Value
+from django.db.models.functions import Concat
+from django.http import QueryDict
+from django.utils import timezone
+
+from HanggarinApp import rollups, search
+from HanggarinApp.cache import bump_models, bump_version
+from HanggarinApp.counters import recount_task_counters
+from HanggarinApp.deletes import delete_in_chunks
+from HanggarinApp.exports import export_tasks
+from HanggarinApp.imports import import_tasks
+from HanggarinApp.models import Category, Priority, Task, Job
+from HanggarinApp.stats import DASHBOARD_NAMESPACE
+
+logger = logging.getLogger('hanggarin.jobs')
+
+# Job kinds: name -> callable(job, **payload) returning a JSON-able result.
+# Handlers report progress through job.report(); an exception fails the
+# attempt and the job is retried with backoff until max_attempts.
+REGISTRY = {}
+
+CLAIM_SQL = (
+    'UPDATE {table} SET {status} = %s, {locked_by} = %s, {locked_at} = %s, {attempts} = {attempts} + 1 '
+    'WHERE {id} = (SELECT {id} FROM {table} WHERE {status} = %s AND {run_after} <= %s '
+    'ORDER BY {run_after}, {id} LIMIT 1{skip_locked}) '
+    'RETURNING {id}'
+)
+
+
+def job(kind):
+    def register(func):
+        REGISTRY[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind, user=None, max_attempts=None, **payload):
+    if kind not in REGISTRY:
+        raise ValueError(f'Unknown job kind {kind!r}; use one of {", ".join(sorted(REGISTRY))}.')
+    return Job.objects.create(
+        kind=kind, payload=payload,
+        created_by=user if user is not None and user.is_authenticated else None,
+        max_attempts=max_attempts or settings.HANGGARIN_JOB_MAX_ATTEMPTS,
+    )
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def update_returning(connection):
+    """Whether the database runs UPDATE ... RETURNING (SQLite from 3.35)."""
+    if connection.vendor == 'sqlite':
+        return connection.Database.sqlite_version_info >= (3, 35)
+    return connection.vendor == 'postgresql'
+
+
+def claim(worker):
+    """Take the next due job for ``worker`` in one UPDATE ... RETURNING; None when idle.
+
+    Postgres skips rows another worker has locked; SQLite serializes writers,
+    so two workers can never claim the same row either way. Without RETURNING
+    the oldest due job is selected, then taken with an UPDATE conditional on
+    it still being queued.
+    """
+    connection = connections[router.db_for_write(Job)]
+    if not update_returning(connection):
+        return _claim_selected(connection, worker)
+    qn = connection.ops.quote_name
+    sql = CLAIM_SQL.format(
+        table=qn(Job._meta.db_table), id=qn('id'), status=qn('status'), locked_by=qn('locked_by'),
+        locked_at=qn('locked_at'), attempts=qn('attempts'), run_after=qn('run_after'),
+        skip_locked=' FOR UPDATE SKIP LOCKED' if connection.features.has_select_for_update_skip_locked else '',
+    )
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    with transaction.atomic(using=connection.alias):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [Job.RUNNING, worker, now, Job.QUEUED, now])
+            row = cursor.fetchone()
+    if row is None:
+        return None
+    return Job.objects.using(connection.alias).get(pk=row[0])
+
+
+def _claim_selected(connection, worker):
+    jobs = Job.objects.using(connection.alias)
+    while True:
+        now = timezone.now()
+        pk = (
+            jobs.filter(status=Job.QUEUED, run_after__lte=now)
+            .order_by('run_after', 'id').values_list('pk', flat=True).first()
+        )
+        if pk is None:
+            return None
+        if jobs.filter(pk=pk, status=Job.QUEUED).update(
+            status=Job.RUNNING, locked_by=worker, locked_at=now, attempts=F('attempts') + 1, updated_at=now,
+        ):
+            return jobs.get(pk=pk)
+        # Another worker took it in between: try the next one.
+
+
+def retry_delay(attempts):
+    """Seconds before attempt ``attempts + 1``: exponential, capped, jittered."""
+    delay = min(settings.HANGGARIN_JOB_RETRY_DELAY * 2 ** max(attempts - 1, 0), settings.HANGGARIN_JOB_MAX_RETRY_DELAY)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _finish(job, **fields):
+    """Write the outcome of ``job``'s attempt, unless the attempt was declared
+    dead meanwhile (requeue_stale) and the job is someone else's now."""
+    fields.update(locked_by='', updated_at=timezone.now())
+    finished = Job.objects.filter(pk=job.pk, status=Job.RUNNING, locked_by=job.locked_by).update(**fields)
+    if not finished:
+        logger.warning('Job %s was requeued while it ran; dropping this attempt\'s outcome', job)
+    for name, value in fields.items():
+        setattr(job, name, value)
+    return bool(finished)
+
+
+def fail(job, error):
+    now = timezone.now()
+    if job.attempts < job.max_attempts:
+        return _finish(job, status=Job.QUEUED, error=error, run_after=now + timedelta(seconds=retry_delay(job.attempts)))
+    return _finish(job, status=Job.FAILED, error=error, finished_at=now)
+
+
+def requeue_stale():
+    """Fail the attempts of jobs whose worker stopped sending heartbeats
+    (killed, host lost). Each outcome is one conditional UPDATE, so two
+    workers sweeping at once cannot both act on a job."""
+    now = timezone.now()
+    stale = Job.objects.using(router.db_for_write(Job)).filter(
+        status=Job.RUNNING, updated_at__lt=now - timedelta(seconds=settings.HANGGARIN_JOB_TIMEOUT),
+    )
+    error = Concat(Value('Worker '), F('locked_by'), Value(' stopped responding.'), output_field=TextField())
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, error=error, locked_by='', finished_at=now, updated_at=now,
+    )
+    requeued = stale.filter(attempts__lt=F('max_attempts')).update(
+        status=Job.QUEUED, error=error, locked_by='', updated_at=now,
+        run_after=now + timedelta(seconds=settings.HANGGARIN_JOB_RETRY_DELAY),
+    )
+    return failed + requeued
+
+
+def beat(job):
+    """Mark ``job``'s attempt as alive; False once it is no longer ours."""
+    return bool(Job.objects.filter(pk=job.pk, status=Job.RUNNING, locked_by=job.locked_by).update(
+        updated_at=timezone.now(),
+    ))
+
+
+@contextmanager
+def heartbeat(job):
+    """Beat for ``job`` every HANGGARIN_JOB_HEARTBEAT_SECONDS from a thread,
+    so handlers that never report progress are not taken for dead."""
+    done = threading.Event()
+
+    def run():
+        try:
+            while not done.wait(settings.HANGGARIN_JOB_HEARTBEAT_SECONDS):
+                if not beat(job):
+                    break
+        finally:
+            connections.close_all()  # this thread's connections only
+
+    thread = threading.Thread(target=run, name=f'hanggarin-heartbeat-{job.pk}', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        done.set()
+        thread.join()
+
+
+def run(job):
+    """Run a claimed job to completion or to its next retry; True on success."""
+    handler = REGISTRY.get(job.kind)
+    try:
+        if handler is None:
+            raise LookupError(f'Unknown job kind {job.kind!r}.')
+        with heartbeat(job):
+            result = handler(job, **job.payload)
+    except Exception:
+        logger.exception('Job %s failed (attempt %s of %s)', job, job.attempts, job.max_attempts)
+        fail(job, traceback.format_exc(limit=5))
+        return False
+    if _finish(job, status=Job.DONE, result=result, finished_at=timezone.now()):
+        logger.info('Job %s done', job)
+    return True
+
+
+def work(worker=None, stop=None, burst=False, poll=None):
+    """Claim and run jobs until ``stop`` is set, or with ``burst`` until none
+    are due. Returns how many jobs ran."""
+    worker = worker or worker_name()
+    poll = settings.HANGGARIN_JOB_POLL_SECONDS if poll is None else poll
+    processed = 0
+    while stop is None or not stop.is_set():
+        requeue_stale()
+        job = claim(worker)
+        if job is None:
+            if burst:
+                break
+            if stop is not None:
+                stop.wait(poll)
+            else:
+                time.sleep(poll)
+            continue
+        run(job)
+        processed += 1
+    return processed
+
+
+# Handlers.
+
+@job('delete_tree')
+def delete_tree_job(job, model, pk):
+    obj = {'category': Category, 'priority': Priority, 'task': Task}[model].objects.filter(pk=pk).first()
+    if obj is None:
+        return {'deleted': 0}
+    return {'deleted': delete_in_chunks(obj, job.report)}
+
+
+@job('recount')
+def recount_job(job):
+    updated = recount_task_counters()
+    bump_models(Task)
+    return {'tasks': updated}
+
+
+@job('rebuild_search_index')
+def rebuild_search_index_job(job):
+    search.rebuild()
+    return {}
+
+
+@job('rebuild_rollups')
+def rebuild_rollups_job(job):
+    rows = rollups.rebuild()
+    bump_version(DASHBOARD_NAMESPACE)
+    return {'rows': rows}
+
+
+@job('seed')
+def seed_job(job, **options):
+    call_command('create_initial_data_', **options)
+    return options
+
+
+def job_file(job, suffix):
+    os.makedirs(settings.HANGGARIN_JOB_FILES_DIR, exist_ok=True)
+    return os.path.join(settings.HANGGARIN_JOB_FILES_DIR, f'job-{job.pk}{suffix}')
+
+
+@job('export_tasks')
+def export_tasks_job(job, params=None, format='csv', gzip=False):
+    from HanggarinApp.views import filtered_tasks  # views enqueue jobs
+
+    query = QueryDict(mutable=True)
+    query.update(params or {})
+    tasks = filtered_tasks(query)
+    total = tasks.count()
+    job.report(0, total, 'Exporting')
+    filename = f'tasks.{format}' + ('.gz' if gzip else '')
+    path = job_file(job, '.' + filename)
+    written = 0
+    with open(path, 'wb') as fh:
+        for chunk in export_tasks(tasks, format, compress=gzip):
+            fh.write(chunk if gzip else chunk.encode('utf-8'))
+            written += len(chunk)
+            if written >= 1 << 20:
+                job.report(job.progress_done, message=f'Exported {fh.tell() >> 20} MB')
+                written = 0
+    job.report(total, message=f'Exported {total} tasks')
+    return {'path': path, 'filename': filename, 'tasks': total}
+
+
+class _ProgressReader:
+    """Text stream wrapper reporting how far through the file an import is."""
+
+    def __init__(self, fh, job, size):
+        self.fh, self.job, self.size, self.reported = fh, job, size, 0
+
+    def __iter__(self):
+        for line in self.fh:
+            position = self.fh.buffer.tell()
+            if position - self.reported >= 1 << 20:
+                self.job.report(position, self.size)
+                self.reported = position
+            yield line
+
+    def read(self, *args):
+        return self.fh.read(*args)
+
+
+@job('import_tasks')
+def import_tasks_job(job, path, format):
+    size = os.path.getsize(path)
+    job.report(0, size, 'Importing')
+    with open(path, encoding='utf-8', newline='') as fh:
+        result = import_tasks(_ProgressReader(fh, job, size), format)
+    os.remove(path)
+    job.report(size, message=f'Imported {result.tasks} tasks')
+    return {
+        'tasks': result.tasks, 'subtasks': result.subtasks, 'notes': result.notes,
+        'categories': result.categories, 'priorities': result.priorities,
+        'error_count': result.error_count, 'errors': result.errors[:100],
+    }
@@ -0,0 +1,184 @@
+import json
+import math
+import subprocess
+from contextlib import nullcontext
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.http import QueryDict
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from HanggarinApp.counters import PROGRESS
+from HanggarinApp.models import Task, SubTask, Note
+from HanggarinApp.pagination import CursorPaginationMixin
+from HanggarinApp.perf import percentile, seeded_test_db
+from HanggarinApp.views import list_queryset
+
+LIST_VIEWS = {
+    'category-list': (None, ['name']),
+    'priority-list': (None, ['name']),
+    'task-list': (Task, ['title', 'status', 'deadline', 'priority__name', 'category__name', 'created_at', '-created_at',
+                         'progress']),
+    'subtask-list': (SubTask, ['task__title', 'title', 'status', 'created_at', '-created_at']),
+    'note-list': (Note, ['task__title', 'content', 'created_at', '-created_at']),
+}
+ADMIN_CHANGELISTS = ['task', 'subtask', 'note', 'category', 'priority']
+
+
+class Command(BaseCommand):
+    help = 'Benchmark list, search and dashboard views against a synthetic dataset'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=10000, help='Number of tasks to seed')
+        parser.add_argument('--subtasks', type=int, default=50000, help='Number of subtasks to seed')
+        parser.add_argument('--notes', type=int, default=20000, help='Number of notes to seed')
+        parser.add_argument('--seed', type=int, default=1, help='Seed for the generated data')
+        parser.add_argument('--requests', type=int, default=30, help='Timed requests per scenario')
+        parser.add_argument('--search', default='report', help='Search term for the q scenarios')
+        parser.add_argument('--only', default='', help='Only run scenarios whose label contains this text')
+        parser.add_argument('--cold', action='store_true',
+                            help='Disable the cache so every request renders its table from the ORM')
+        parser.add_argument('--keepdb', action='store_true', help='Reuse (and keep) the benchmark database')
+        parser.add_argument('--output', help='Write JSON results to this file')
+        parser.add_argument('--compare', help='Baseline JSON results to compare against')
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help='Allowed p95 slowdown against the baseline (0.2 = 20%%)')
+
+    def handle(self, *args, **options):
+        with seeded_test_db(options, self.stdout):
+            # Warm, the timed requests mostly serve cached tables; cold, every
+            # one runs its queries, which is what ORM and index changes affect.
+            cold = override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+            with cold if options['cold'] else nullcontext():
+                results = self.run_scenarios(options)
+
+        report = {
+            'meta': {
+                'commit': self.git_commit(),
+                'created_at': timezone.now().isoformat(),
+                'tasks': options['tasks'],
+                'subtasks': options['subtasks'],
+                'notes': options['notes'],
+                'requests': options['requests'],
+                'cold': options['cold'],
+            },
+            'results': results,
+        }
+        self.print_report(results)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}.'))
+        if options['compare']:
+            self.compare(results, options['compare'], options['threshold'], options['cold'])
+
+    def scenarios(self, options):
+        yield 'home', reverse('home'), {}
+        for name, (model, orderings) in LIST_VIEWS.items():
+            url = reverse(name)
+            yield f'{name} page 1', url, {}
+            yield f'{name} deep offset page', url, {'page': self.deep_page(url)}
+            for sort_by in orderings:
+                yield f'{name} sort {sort_by}', url, {'sort_by': sort_by}
+                if model is not None:
+                    yield f'{name} sort {sort_by} deep cursor', url, {
+                        'sort_by': sort_by, 'cursor': self.deep_cursor(model, sort_by),
+                    }
+            if model is not None:
+                yield f'{name} search', url, {'q': options['search']}
+        for model_name in ADMIN_CHANGELISTS:
+            yield f'admin {model_name} changelist', reverse(f'admin:HanggarinApp_{model_name}_changelist'), {}
+
+    def deep_page(self, url):
+        # From the queryset: a cached table response carries no paginator.
+        view_class = resolve(url).func.view_class
+        count = list_queryset(view_class, QueryDict()).count()
+        return max(math.ceil(count / view_class.paginate_by), 1)
+
+    def deep_cursor(self, model, sort_by):
+        # A token pointing at the middle of the ordering, as if the client had
+        # paged that far.
+        queryset = model.objects.annotate(progress=PROGRESS) if model is Task else model.objects
+        ordered = queryset.order_by(sort_by, '-pk' if sort_by.startswith('-') else 'pk')
+        count = model.objects.count()
+        if not count:
+            return ''
+        obj = ordered[count // 2]
+        return CursorPaginationMixin()._encode(sort_by, obj, backwards=False)
+
+    def run_scenarios(self, options):
+        User = get_user_model()
+        user = User.objects.filter(username='bench').first() or User.objects.create_superuser(
+            username='bench', email='bench@example.com', password=None,
+        )
+        self.client = Client()
+        self.client.force_login(user)
+
+        results = {}
+        for label, url, params in self.scenarios(options):
+            if options['only'] and options['only'] not in label:
+                continue
+            self.client.get(url, params)  # warm-up
+            latencies, queries = [], []
+            started = perf_counter()
+            for _ in range(options['requests']):
+                with CaptureQueriesContext(connection) as captured:
+                    start = perf_counter()
+                    resp = self.client.get(url, params)
+                    latencies.append((perf_counter() - start) * 1000)
+                queries.append(len(captured))
+                if resp.status_code != 200:
+                    raise CommandError(f'{label}: {url} returned {resp.status_code}')
+            elapsed = perf_counter() - started
+            results[label] = {
+                'url': url,
+                'params': params,
+                'p50_ms': round(percentile(latencies, 50), 2),
+                'p95_ms': round(percentile(latencies, 95), 2),
+                'p99_ms': round(percentile(latencies, 99), 2),
+                'queries': round(sum(queries) / len(queries), 2),
+                'rps': round(len(latencies) / elapsed, 1),
+            }
+        return results
+
+    def print_report(self, results):
+        self.stdout.write(f'{"scenario":<48} {"p50":>8} {"p95":>8} {"p99":>8} {"queries":>8} {"rps":>8}')
+        for label, row in results.items():
+            self.stdout.write(
+                f'{label:<48} {row["p50_ms"]:>8} {row["p95_ms"]:>8} {row["p99_ms"]:>8} '
+                f'{row["queries"]:>8} {row["rps"]:>8}'
+            )
+
+    def compare(self, results, path, threshold, cold):
+        with open(path) as fh:
+            baseline = json.load(fh)
+        if baseline['meta'].get('cold', False) != cold:
+            raise CommandError(f'{path} was measured with{"" if baseline["meta"].get("cold") else "out"} --cold; '
+                               f'compare like with like.')
+        baseline = baseline['results']
+        regressions = []
+        for label, row in results.items():
+            before = baseline.get(label)
+            if not before:
+                continue
+            if row['queries'] > before['queries']:
+                regressions.append(f'{label}: queries {before["queries"]} -> {row["queries"]}')
+            if row['p95_ms'] > before['p95_ms'] * (1 + threshold):
+                regressions.append(f'{label}: p95 {before["p95_ms"]}ms -> {row["p95_ms"]}ms')
+        if regressions:
+            raise CommandError('Performance regressions:\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS(f'No regressions against {path}.'))
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -1,65 +1,120 @@
-from django.core.management.base import BaseCommand
-from faker import Faker
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 from django.utils import timezone
-from HanggarinApp.models import Category, Priority, Task, SubTask, Note
+from faker import Faker
+
+from HanggarinApp import rollups, search
+from HanggarinApp.cache import bump_models, bump_version
+from HanggarinApp.counters import COMPLETED, recount_task_counters
+from HanggarinApp.models import Category, Priority, Task, SubTask, Note, STATUS_CHOICES
+from HanggarinApp.stats import DASHBOARD_NAMESPACE
+
+DEFAULT_CATEGORIES = ['Work', 'School', 'Personal', 'Finance', 'Projects']
+DEFAULT_PRIORITIES = ['High', 'Medium', 'Low', 'Critical', 'Optional']
+STATUSES = [value for value, _ in STATUS_CHOICES]
+TEXT_POOL_SIZE = 500
+
 
 class Command(BaseCommand):
     help = 'Create initial data for the web application'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=10, help='Number of tasks to create')
+        parser.add_argument('--subtasks', type=int, default=10, help='Number of subtasks to create')
+        parser.add_argument('--notes', type=int, default=10, help='Number of notes to create')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk insert transaction')
+        parser.add_argument('--seed', type=int, default=None, help='Seed for repeatable data')
+
     def handle(self, *args, **kwargs):
-        self.create_task(10)
-        self.create_notes(10)
-        self.create_subtask(10)
+        if kwargs['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+        self.batch_size = kwargs['batch_size']
+        self.random = random.Random(kwargs['seed'])
+        self.fake = Faker()
+        if kwargs['seed'] is not None:
+            self.fake.seed_instance(kwargs['seed'])
+
+        # Faker is the slow part, so build a pool of texts once and sample it.
+        self.titles = [self.fake.sentence(nb_words=5) for _ in range(TEXT_POOL_SIZE)]
+        self.paragraphs = [self.fake.paragraph(nb_sentences=3) for _ in range(TEXT_POOL_SIZE)]
+
+        self.create_lookups()
+        self.create_task(kwargs['tasks'])
+        self.create_subtask(kwargs['subtasks'])
+        self.create_notes(kwargs['notes'])
+        if kwargs['subtasks'] or kwargs['notes']:
+            recount_task_counters()
+        bump_version(DASHBOARD_NAMESPACE)
+        bump_models(Category, Priority, Task, SubTask, Note)
+
+    def write_batches(self, model, count, build):
+        floor = model.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+        remaining = count
+        while remaining > 0:
+            size = min(self.batch_size, remaining)
+            objs = [build() for _ in range(size)]
+            with transaction.atomic():
+                model.objects.bulk_create(objs, batch_size=self.batch_size)
+            remaining -= size
+        # bulk_create skips signals, so index and count the new rows in one pass.
+        if count and model in search.DOCUMENTS:
+            search.reindex(model, model.objects.filter(pk__gt=floor))
+        if count and model in rollups.FIELDS:
+            rollups.add(model.objects.filter(pk__gt=floor))
+
+    def create_lookups(self):
+        if not Category.objects.exists():
+            Category.objects.bulk_create([Category(name=name) for name in DEFAULT_CATEGORIES])
+        if not Priority.objects.exists():
+            Priority.objects.bulk_create([Priority(name=name) for name in DEFAULT_PRIORITIES])
+        self.category_ids = list(Category.objects.values_list('id', flat=True))
+        self.priority_ids = list(Priority.objects.values_list('id', flat=True))
+
+    def random_status(self):
+        status = self.random.choice(STATUSES)
+        return {'status': status, 'completed_at': self.now if status == COMPLETED else None}
+
+    def random_deadline(self):
+        return self.now + timezone.timedelta(minutes=self.random.randint(-525600, 525600))
 
     def create_task(self, count):
-        fake = Faker()
-
-        for _ in range(count):
-            words = [fake.word() for _ in range(2)]  # two words
-            task_name = ' '.join(words)
-            Task.objects.create(    
-                title=fake.sentence(nb_words=5),
-                description=fake.paragraph(nb_sentences=3),
-                deadline=timezone.make_aware(fake.date_time_between()),
-                status=fake.random_element(
-                    elements=['Pending', 'In Progress', 'Completed']
-                    ),
-                category=Category.objects.order_by('?').first(),
-                priority=Priority.objects.order_by('?').first(),
-            )
+        self.now = timezone.now()
+        self.write_batches(Task, count, lambda: Task(
+            title=self.random.choice(self.titles),
+            description=self.random.choice(self.paragraphs),
+            deadline=self.random_deadline(),
+            **self.random_status(),
+            category_id=self.random.choice(self.category_ids),
+            priority_id=self.random.choice(self.priority_ids),
+        ))
+        self.task_ids = list(Task.objects.values_list('id', flat=True))
 
         self.stdout.write(self.style.SUCCESS(
-            'Initial data for task created successfully.'))
-    
-    def create_notes(self, count):
-        fake = Faker()
+            f'Initial data for task created successfully ({count} rows).'))
 
-        for _ in range(count):
-            words = [fake.word() for _ in range(2)]  # two words
-            note_name = ' '.join(words)
-            Note.objects.create(    
-                task=Task.objects.order_by('?').first(),
-                content=fake.paragraph(nb_sentences=3),
-            )
+    def require_tasks(self, count):
+        if count and not self.task_ids:
+            raise CommandError('Cannot create subtasks or notes without any tasks.')
+
+    def create_notes(self, count):
+        self.require_tasks(count)
+        self.write_batches(Note, count, lambda: Note(
+            task_id=self.random.choice(self.task_ids),
+            content=self.random.choice(self.paragraphs),
+        ))
 
         self.stdout.write(self.style.SUCCESS(
-            'Initial data for note created successfully.'))
+            f'Initial data for note created successfully ({count} rows).'))
 
     def create_subtask(self, count):
-        fake = Faker()
-
-        for _ in range(count):
-            words = [fake.word() for _ in range(2)]  # two words
-            subtask_name = ' '.join(words)
-            SubTask.objects.create(    
-                parent_task=Task.objects.order_by('?').first(),
-                title=fake.sentence(nb_words=5),
-                status=fake.random_element(
-                    elements=['Pending', 'In Progress', 'Completed']
-                    ),
-                
-
-            )
+        self.require_tasks(count)
+        self.write_batches(SubTask, count, lambda: SubTask(
+            task_id=self.random.choice(self.task_ids),
+            title=self.random.choice(self.titles),
+            **self.random_status(),
+        ))
 
         self.stdout.write(self.style.SUCCESS(
-            'Initial data for subtask created successfully.'))
\ No newline at end of file
+            f'Initial data for subtask created successfully ({count} rows).'))
@@ -0,0 +1,28 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from HanggarinApp.jobs import REGISTRY, enqueue
+
+
+class Command(BaseCommand):
+    help = 'Queue a background job for run_workers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(REGISTRY), help='Job kind')
+        parser.add_argument('payload', nargs='*', metavar='key=value',
+                            help='Handler arguments; values are parsed as JSON when they can be')
+        parser.add_argument('--max-attempts', type=int, default=None, help='Attempts before the job fails')
+
+    def handle(self, *args, **kwargs):
+        payload = {}
+        for item in kwargs['payload']:
+            key, sep, value = item.partition('=')
+            if not sep or not key:
+                raise CommandError(f'Expected key=value, got {item!r}.')
+            try:
+                payload[key] = json.loads(value)
+            except ValueError:
+                payload[key] = value
+        job = enqueue(kwargs['kind'], max_attempts=kwargs['max_attempts'], **payload)
+        self.stdout.write(self.style.SUCCESS(f'Queued {job}.'))
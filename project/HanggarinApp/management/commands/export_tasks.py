@@ -0,0 +1,47 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.http import QueryDict
+
+from HanggarinApp.exports import FORMATS, export_tasks
+from HanggarinApp.views import filtered_tasks
+
+
+class Command(BaseCommand):
+    help = 'Stream every task with its subtasks and notes as CSV or JSONL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(FORMATS), default='csv', help='Output format')
+        parser.add_argument('--gzip', action='store_true', help='Gzip the output')
+        parser.add_argument('--q', default='', help='Search filter, as on the task list')
+        parser.add_argument('--sort-by', default='', help='Ordering, as on the task list')
+        parser.add_argument('--chunk-size', type=int, default=None, help='Tasks fetched per round trip')
+        parser.add_argument('--output', '-o', help='Write to this file instead of stdout')
+
+    def handle(self, *args, **kwargs):
+        if kwargs['chunk_size'] is not None and kwargs['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive.')
+        params = QueryDict(mutable=True)
+        if kwargs['q']:
+            params['q'] = kwargs['q']
+        if kwargs['sort_by']:
+            params['sort_by'] = kwargs['sort_by']
+        chunks = export_tasks(
+            filtered_tasks(params), kwargs['format'], compress=kwargs['gzip'], chunk_size=kwargs['chunk_size'],
+        )
+        if kwargs['output']:
+            if kwargs['gzip']:
+                fh = open(kwargs['output'], 'wb')
+            else:
+                fh = open(kwargs['output'], 'w', encoding='utf-8', newline='')
+            with fh:
+                for chunk in chunks:
+                    fh.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f'Export written to {kwargs["output"]}.'))
+        elif kwargs['gzip']:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
@@ -0,0 +1,44 @@
+import sys
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from HanggarinApp.imports import FORMATS, import_tasks
+
+
+class Command(BaseCommand):
+    help = 'Bulk import tasks with their subtasks and notes from CSV or JSONL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, or '-' for stdin")
+        parser.add_argument('--format', choices=FORMATS, help='Input format (default: from the file extension)')
+        parser.add_argument('--batch-size', type=int, default=None, help='Tasks per transaction')
+        parser.add_argument('--show-errors', type=int, default=20, help='How many row errors to print')
+
+    def handle(self, *args, **kwargs):
+        path = kwargs['path']
+        fmt = kwargs['format'] or path.rsplit('.', 1)[-1].lower()
+        if fmt not in FORMATS:
+            raise CommandError('Cannot tell the format from the file name; pass --format.')
+        if kwargs['batch_size'] is not None and kwargs['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+
+        started = perf_counter()
+        if path == '-':
+            result = import_tasks(sys.stdin, fmt, kwargs['batch_size'])
+        else:
+            try:
+                stream = open(path, encoding='utf-8', newline='')
+            except OSError as exc:
+                raise CommandError(str(exc))
+            with stream:
+                result = import_tasks(stream, fmt, kwargs['batch_size'])
+        elapsed = perf_counter() - started
+
+        rows = result.tasks + result.subtasks + result.notes
+        for line, message in result.errors[:kwargs['show_errors']]:
+            self.stderr.write(f'line {line}: {message}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {result.tasks} tasks, {result.subtasks} subtasks and {result.notes} notes '
+            f'({rows / elapsed if elapsed else rows:.0f} rows/s); created {result.categories} categories '
+            f'and {result.priorities} priorities; {result.error_count} row(s) skipped.'))
@@ -0,0 +1,138 @@
+import asyncio
+import itertools
+import json
+import threading
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+
+from HanggarinApp.perf import percentile, seeded_test_db
+
+DEFAULT_PATHS = ['/', '/tasks/', '/tasks/?q=report', '/subtasks/?sort_by=title&cursor=', '/notes/']
+URLCONFS = {'wsgi': 'projectsite.urls', 'asgi': 'projectsite.asgi_urls'}
+
+
+class Command(BaseCommand):
+    help = 'Compare requests/sec and tail latency of the WSGI and ASGI stacks under concurrent clients'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=2000, help='Number of tasks to seed')
+        parser.add_argument('--subtasks', type=int, default=10000, help='Number of subtasks to seed')
+        parser.add_argument('--notes', type=int, default=4000, help='Number of notes to seed')
+        parser.add_argument('--seed', type=int, default=1, help='Seed for the generated data')
+        parser.add_argument('--clients', type=int, default=16, help='Concurrent clients')
+        parser.add_argument('--requests', type=int, default=400, help='Requests per mode, spread over the paths')
+        parser.add_argument('--path', action='append', dest='paths', help='Path to request (repeatable)')
+        parser.add_argument('--mode', action='append', dest='modes', choices=sorted(URLCONFS),
+                            help='Only run this mode (repeatable)')
+        parser.add_argument('--cold', action='store_true', help='Disable the cache so every request hits the ORM')
+        parser.add_argument('--keepdb', action='store_true', help='Reuse (and keep) the load test database')
+        parser.add_argument('--output', help='Write JSON results to this file')
+
+    def handle(self, *args, **options):
+        # Both stacks are driven in-process through Django's test handlers
+        # (the full middleware chain, no sockets) against a throwaway database:
+        # WSGI with one thread per client, ASGI with one task per client.
+        with seeded_test_db(options, self.stdout, 'load test'):
+            User = get_user_model()
+            self.user = User.objects.filter(username='loadtest').first() or User.objects.create_superuser(
+                username='loadtest', email='loadtest@example.com', password=None,
+            )
+            results = {}
+            cache_settings = {}
+            if options['cold']:
+                cache_settings['CACHES'] = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+            for mode in options['modes'] or ['wsgi', 'asgi']:
+                with override_settings(ROOT_URLCONF=URLCONFS[mode], **cache_settings):
+                    runner = self.run_wsgi if mode == 'wsgi' else self.run_asgi
+                    results[mode] = runner(options['paths'] or DEFAULT_PATHS, options['clients'], options['requests'])
+
+        self.print_report(results)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(results, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}.'))
+
+    def run_wsgi(self, paths, clients, total):
+        counter = itertools.count()
+        latencies, errors = [], []
+        lock = threading.Lock()
+        # Logins write sessions, so they happen before the clients start.
+        pool = []
+        for _ in range(clients):
+            client = Client()
+            client.force_login(self.user)
+            pool.append(client)
+        for path in paths:
+            pool[0].get(path)  # warm-up
+
+        def worker(client):
+            try:
+                while (index := next(counter)) < total:
+                    start = perf_counter()
+                    resp = client.get(paths[index % len(paths)])
+                    elapsed = perf_counter() - start
+                    with lock:
+                        latencies.append(elapsed * 1000)
+                        if resp.status_code != 200:
+                            errors.append(resp.status_code)
+            finally:
+                connections.close_all()
+
+        started = perf_counter()
+        threads = [threading.Thread(target=worker, args=(client,)) for client in pool]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.summarize(latencies, errors, perf_counter() - started)
+
+    def run_asgi(self, paths, clients, total):
+        return asyncio.run(self.arun_asgi(paths, clients, total))
+
+    async def arun_asgi(self, paths, clients, total):
+        counter = itertools.count()
+        latencies, errors = [], []
+        pool = []
+        for _ in range(clients):
+            client = AsyncClient()
+            await client.aforce_login(self.user)
+            pool.append(client)
+        for path in paths:
+            await pool[0].get(path)  # warm-up
+
+        async def worker(client):
+            while (index := next(counter)) < total:
+                start = perf_counter()
+                resp = await client.get(paths[index % len(paths)])
+                latencies.append((perf_counter() - start) * 1000)
+                if resp.status_code != 200:
+                    errors.append(resp.status_code)
+
+        started = perf_counter()
+        await asyncio.gather(*(worker(client) for client in pool))
+        return self.summarize(latencies, errors, perf_counter() - started)
+
+    def summarize(self, latencies, errors, elapsed):
+        return {
+            'requests': len(latencies),
+            'errors': len(errors),
+            'rps': round(len(latencies) / elapsed, 1) if elapsed else 0,
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'max_ms': round(max(latencies, default=0), 2),
+        }
+
+    def print_report(self, results):
+        self.stdout.write(f'{"mode":<6} {"requests":>9} {"errors":>7} {"rps":>8} {"p50":>8} {"p95":>8} '
+                          f'{"p99":>8} {"max":>8}')
+        for mode, row in results.items():
+            self.stdout.write(
+                f'{mode:<6} {row["requests"]:>9} {row["errors"]:>7} {row["rps"]:>8} {row["p50_ms"]:>8} '
+                f'{row["p95_ms"]:>8} {row["p99_ms"]:>8} {row["max_ms"]:>8}'
+            )
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from HanggarinApp.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = 'Delete sync tombstones older than the retention window'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.HANGGARIN_SYNC_RETENTION_DAYS,
+                            help='Keep tombstones this many days (clients with older cursors resync)')
+
+    def handle(self, *args, **kwargs):
+        deleted = prune_tombstones(kwargs['days'])
+        self.stdout.write(self.style.SUCCESS(f'Pruned {deleted} tombstone(s).'))
@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from HanggarinApp.cache import bump_version
+from HanggarinApp.rollups import rebuild
+from HanggarinApp.stats import DASHBOARD_NAMESPACE
+
+
+class Command(BaseCommand):
+    help = 'Recompute the daily dashboard rollups from the task, subtask and note tables'
+
+    def handle(self, *args, **kwargs):
+        started = time.perf_counter()
+        rows = rebuild()
+        bump_version(DASHBOARD_NAMESPACE)
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {rows} rollup row(s) in {time.perf_counter() - started:.2f}s.'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from HanggarinApp import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search tables for tasks, subtasks and notes'
+
+    def handle(self, *args, **kwargs):
+        search.rebuild()
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt successfully.'))
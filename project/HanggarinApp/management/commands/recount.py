@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from HanggarinApp.cache import bump_models
+from HanggarinApp.counters import drifted_tasks, recount_task_counters
+from HanggarinApp.models import Task
+
+
+class Command(BaseCommand):
+    help = 'Recompute the subtask and note counters stored on each task'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Only report tasks whose counters drifted')
+
+    def handle(self, *args, **kwargs):
+        drifted = drifted_tasks().count()
+        if kwargs['check']:
+            self.stdout.write(f'{drifted} task(s) have drifted counters.')
+            return
+        updated = recount_task_counters()
+        bump_models(Task)
+        self.stdout.write(self.style.SUCCESS(
+            f'Counters recomputed for {updated} task(s); {drifted} had drifted.'))
@@ -0,0 +1,79 @@
+import multiprocessing
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+def worker_process(stop, burst, poll):
+    """Entry point of a spawned worker; it imports Django afresh."""
+    import django
+
+    django.setup()
+    from HanggarinApp.jobs import work
+
+    # Ctrl-C reaches the whole process group: let the parent decide, and
+    # finish the current job when it sets ``stop``.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    work(stop=stop, burst=burst, poll=poll)
+
+
+class Command(BaseCommand):
+    help = 'Run background jobs from the database queue until stopped'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=settings.HANGGARIN_JOB_WORKERS,
+                            help='Worker processes; 1 runs jobs in this process')
+        parser.add_argument('--burst', action='store_true', help='Exit once no job is due')
+        parser.add_argument('--poll', type=float, default=settings.HANGGARIN_JOB_POLL_SECONDS,
+                            help='Seconds between claims while idle')
+
+    def handle(self, *args, **kwargs):
+        workers, burst, poll = kwargs['workers'], kwargs['burst'], kwargs['poll']
+        if workers < 1:
+            raise CommandError('--workers must be at least 1.')
+        if workers == 1:
+            from HanggarinApp.jobs import work
+
+            stop = multiprocessing.Event() if not burst else None
+            if stop is not None:
+                self._stop_on_signals(stop)
+            processed = work(stop=stop, burst=burst, poll=poll)
+            self.stdout.write(self.style.SUCCESS(f'Ran {processed} job(s).'))
+            return
+
+        # Spawned rather than forked: children must not share this process's
+        # database connections.
+        context = multiprocessing.get_context('spawn')
+        stop = context.Event()
+        self._stop_on_signals(stop)
+        connections.close_all()
+        # Keyed by slot so a restarted worker keeps its number and name.
+        processes = {number: self._start(context, stop, burst, poll, number) for number in range(workers)}
+        self.stdout.write(f'Started {workers} workers.')
+        while processes:
+            for number, process in list(processes.items()):
+                process.join(timeout=1)
+                if process.is_alive():
+                    continue
+                if burst or stop.is_set():
+                    del processes[number]
+                else:
+                    self.stderr.write(f'{process.name} exited with {process.exitcode}; restarting it.')
+                    processes[number] = self._start(context, stop, burst, poll, number)
+        self.stdout.write(self.style.SUCCESS('Workers stopped.'))
+
+    def _start(self, context, stop, burst, poll, number):
+        process = context.Process(target=worker_process, args=(stop, burst, poll), name=f'hanggarin-worker-{number}')
+        process.start()
+        return process
+
+    def _stop_on_signals(self, stop):
+        def handler(signum, frame):
+            self.stdout.write('Stopping after the current jobs...')
+            stop.set()
+
+        signal.signal(signal.SIGINT, handler)
+        signal.signal(signal.SIGTERM, handler)
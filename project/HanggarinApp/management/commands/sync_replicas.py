@@ -0,0 +1,27 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = 'Copy the SQLite primary onto the SQLite stand-in replicas'
+
+    def handle(self, *args, **kwargs):
+        replicas = getattr(settings, 'HANGGARIN_REPLICAS', [])
+        if not replicas:
+            raise CommandError('No replicas configured; set DATABASE_REPLICA_URLS.')
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != 'sqlite' or any(connections[alias].vendor != 'sqlite' for alias in replicas):
+            raise CommandError('Only SQLite stand-ins are synced here; real replicas follow the primary themselves.')
+        primary.ensure_connection()
+        for alias in replicas:
+            connections[alias].close()
+            # The backup API copies a consistent snapshot, WAL included.
+            target = sqlite3.connect(str(connections[alias].settings_dict['NAME']))
+            try:
+                primary.connection.backup(target)
+            finally:
+                target.close()
+            self.stdout.write(self.style.SUCCESS(f'{alias} synced from {DEFAULT_DB_ALIAS}.'))
@@ -0,0 +1,190 @@
+import json
+import logging
+import mimetypes
+import os
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse
+from django.utils._os import safe_join
+
+from HanggarinApp import routers
+from HanggarinApp.perf import RequestMetrics, measuring, store
+
+logger = logging.getLogger('hanggarin.perf')
+
+
+class QueryInstrumentationMiddleware:
+    """Record query count, DB time, template render time and wall time per request.
+
+    Results go out as a ``Server-Timing`` header, a JSON log line on the
+    ``hanggarin.perf`` logger and the rolling store behind the staff summary.
+    Queries are counted by perf.count_queries, which every connection carries
+    (HanggarinApp.signals), in whichever thread runs them.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = request.perf_metrics = RequestMetrics()
+        start = perf_counter()
+        with measuring(metrics):
+            response = self.get_response(request)
+        return self.record(request, response, metrics, start)
+
+    async def __acall__(self, request):
+        metrics = request.perf_metrics = RequestMetrics()
+        start = perf_counter()
+        with measuring(metrics):
+            response = await self.get_response(request)
+        return self.record(request, response, metrics, start)
+
+    def record(self, request, response, metrics, start):
+        metrics.wall_time = perf_counter() - start
+
+        match = request.resolver_match
+        url_name = match.view_name if match else None
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={metrics.db_time * 1000:.2f};desc="{metrics.queries} queries"',
+            f'render;dur={metrics.render_time * 1000:.2f}',
+            f'total;dur={metrics.wall_time * 1000:.2f}',
+        ])
+        logger.info(json.dumps({
+            'url_name': url_name,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            **metrics.as_dict(),
+        }))
+        if url_name:
+            store.record(url_name, metrics)
+        return response
+
+    def process_template_response(self, request, response):
+        metrics = getattr(request, 'perf_metrics', None)
+        if metrics is not None:
+            start = perf_counter()
+
+            def rendered(response):
+                metrics.render_time += perf_counter() - start
+
+            response.add_post_render_callback(rendered)
+        return response
+
+
+class ReplicaPinMiddleware:
+    """Keep a client reading from the primary for a while after it writes.
+
+    Unsafe requests read from the primary throughout. One that wrote leaves a
+    short-lived cookie, so the redirect and the next few pages show the edit
+    even while the replicas catch up. A cookie rather than the session, which
+    would cost a primary read on every request.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        tokens = routers.start_request(self.pinned(request))
+        try:
+            return self.pin(self.get_response(request))
+        finally:
+            routers.end_request(tokens)
+
+    async def __acall__(self, request):
+        tokens = routers.start_request(self.pinned(request))
+        try:
+            return self.pin(await self.get_response(request))
+        finally:
+            routers.end_request(tokens)
+
+    def pinned(self, request):
+        return request.method not in ('GET', 'HEAD', 'OPTIONS') or routers.PIN_COOKIE in request.COOKIES
+
+    def pin(self, response):
+        if routers.has_written() and routers.replica_aliases():
+            response.set_cookie(
+                routers.PIN_COOKIE, '1', max_age=getattr(settings, 'HANGGARIN_REPLICA_PIN_SECONDS', 10),
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+
+class StaticAssetMiddleware:
+    """Serve collected static files when Django itself is the file server.
+
+    Picks the .br/.gz variant written by CompressedManifestStorage when the
+    client accepts it. Content-hashed names never change, so they are cached
+    for a year as immutable; anything else must be revalidated.
+    """
+    sync_capable = True
+    async_capable = True
+    IMMUTABLE = 'public, max-age=31536000, immutable'
+    ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'HANGGARIN_SERVE_STATIC', False) and settings.STATIC_ROOT
+        self.prefix = '/' + settings.STATIC_URL.lstrip('/')
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.serve(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        return self.serve(request) or await self.get_response(request)
+
+    def serve(self, request):
+        if not self.enabled or request.method not in ('GET', 'HEAD') or not request.path.startswith(self.prefix):
+            return None
+        name = request.path[len(self.prefix):]
+        try:
+            path = safe_join(settings.STATIC_ROOT, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+        content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        accepted = request.headers.get('Accept-Encoding', '')
+        encoding = None
+        for candidate, suffix in self.ENCODINGS:
+            if candidate in accepted and os.path.isfile(path + suffix):
+                path, encoding = path + suffix, candidate
+                break
+        response = FileResponse(open(path, 'rb'), content_type=content_type, filename=os.path.basename(name))
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Cache-Control'] = self.IMMUTABLE if self.is_hashed(name) else 'public, max-age=0, must-revalidate'
+        return response
+
+    def is_hashed(self, name):
+        hashed_files = getattr(staticfiles_storage, 'hashed_files', None)
+        if not hashed_files:
+            return False
+        if not hasattr(self, '_hashed_names'):
+            self._hashed_names = set(hashed_files.values())
+        return name in self._hashed_names
+
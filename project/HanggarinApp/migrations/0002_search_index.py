@@ -0,0 +1,70 @@
+from django.db import migrations
+
+# The search tables as of this migration, written out rather than read from
+# HanggarinApp.search so later changes there cannot alter what it creates:
+# table -> (source model, [(column, expression, weight label)], joins).
+DOCUMENTS = {
+    'hanggarin_task_search': ('Task', [
+        ('title', 't.title', 'A'),
+        ('description', 't.description', 'C'),
+        ('status', 't.status', 'B'),
+        ('priority', 'p.name', 'B'),
+        ('category', 'c.name', 'B'),
+    ], [('Priority', 'p', 'p.id = t.priority_id'), ('Category', 'c', 'c.id = t.category_id')]),
+    'hanggarin_subtask_search': ('SubTask', [
+        ('title', 't.title', 'A'),
+        ('status', 't.status', 'B'),
+        ('task', 'p.title', 'B'),
+    ], [('Task', 'p', 'p.id = t.task_id')]),
+    'hanggarin_note_search': ('Note', [
+        ('content', 't.content', 'A'),
+        ('task', 'p.title', 'B'),
+    ], [('Task', 'p', 'p.id = t.task_id')]),
+}
+
+
+def install_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in ('sqlite', 'postgresql'):
+        return  # searched with icontains, no tables needed
+
+    def table(name):
+        return schema_editor.quote_name(apps.get_model('HanggarinApp', name)._meta.db_table)
+
+    with schema_editor.connection.cursor() as cursor:
+        for name, (model, columns, joins) in DOCUMENTS.items():
+            source = f'{table(model)} t' + ''.join(f' JOIN {table(other)} {alias} ON {on}' for other, alias, on in joins)
+            if vendor == 'sqlite':
+                names = ', '.join(column for column, _, _ in columns)
+                cursor.execute(
+                    f'CREATE VIRTUAL TABLE IF NOT EXISTS {name} '
+                    f"USING fts5({names}, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+                )
+                values = ', '.join(f"COALESCE({expr}, '')" for _, expr, _ in columns)
+                cursor.execute(f'INSERT INTO {name} (rowid, {names}) SELECT t.id, {values} FROM {source}')
+            else:
+                cursor.execute(f'CREATE TABLE IF NOT EXISTS {name} (id bigint PRIMARY KEY, document tsvector NOT NULL)')
+                cursor.execute(f'CREATE INDEX IF NOT EXISTS {name}_gin ON {name} USING gin (document)')
+                document = ' || '.join(
+                    f"setweight(to_tsvector('simple', COALESCE({expr}, '')), '{label}')" for _, expr, label in columns
+                )
+                cursor.execute(f'INSERT INTO {name} (id, document) SELECT t.id, {document} FROM {source}')
+
+
+def uninstall_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor not in ('sqlite', 'postgresql'):
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for name in DOCUMENTS:
+            cursor.execute(f'DROP TABLE IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('HanggarinApp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:53
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Task = apps.get_model('HanggarinApp', 'Task')
+    SubTask = apps.get_model('HanggarinApp', 'SubTask')
+    Note = apps.get_model('HanggarinApp', 'Note')
+
+    def count(model, **filters):
+        rows = (
+            model.objects.filter(task=OuterRef('pk'), **filters)
+            .order_by().values('task').annotate(n=Count('pk')).values('n')
+        )
+        return Coalesce(Subquery(rows), 0)
+
+    Task.objects.update(
+        subtask_count=count(SubTask),
+        subtask_completed_count=count(SubTask, status='Completed'),
+        note_count=count(Note),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('HanggarinApp', '0003_sort_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='note_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='subtask_completed_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='subtask_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
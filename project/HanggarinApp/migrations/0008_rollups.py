@@ -0,0 +1,82 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:56
+
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import CharField, Count, F, IntegerField, Value
+from django.db.models.functions import Coalesce, TruncDate
+
+
+def backfill_completed_at(apps, schema_editor):
+    # The completion time was never recorded; the last write is the best guess.
+    for name in ('Task', 'SubTask'):
+        apps.get_model('HanggarinApp', name).objects.filter(status='Completed').update(completed_at=F('updated_at'))
+
+
+def backfill_rollups(apps, schema_editor):
+    # What HanggarinApp.rollups.rebuild() computes, against the models as of
+    # this migration: per day, model, status, category and priority, the rows
+    # created, completed and (open past their deadline) due.
+    DailyStats = apps.get_model('HanggarinApp', 'DailyStats')
+    counts = defaultdict(lambda: [0, 0, 0])
+    for name in ('Task', 'SubTask', 'Note'):
+        model = apps.get_model('HanggarinApp', name)
+        rows = model.objects.order_by()
+        group = {'s': Value('', output_field=CharField()), 'c': Value(0, output_field=IntegerField()),
+                 'p': Value(0, output_field=IntegerField())}
+        sources = [(0, 'created_at', rows)]
+        if name != 'Note':
+            group['s'] = F('status')
+            sources.append((1, 'completed_at', rows.filter(completed_at__isnull=False)))
+        if name == 'Task':
+            group['c'], group['p'] = Coalesce('category_id', 0), Coalesce('priority_id', 0)
+            sources.append((2, 'deadline', rows.filter(deadline__isnull=False).exclude(status='Completed')))
+        for column, field, source in sources:
+            for row in source.values(day=TruncDate(field), **group).annotate(n=Count('pk')):
+                counts[(row['day'], name.lower(), row['s'], row['c'], row['p'])][column] += row['n']
+    DailyStats.objects.bulk_create([
+        DailyStats(date=date, model=model, status=status, category=category, priority=priority,
+                   created=created, completed=completed, due=due)
+        for (date, model, status, category, priority), (created, completed, due) in counts.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('HanggarinApp', '0007_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subtask',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_completed_at, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='DailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('model', models.CharField(max_length=20)),
+                ('status', models.CharField(blank=True, max_length=50)),
+                ('category', models.IntegerField(default=0)),
+                ('priority', models.IntegerField(default=0)),
+                ('created', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('due', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'daily stats',
+                'constraints': [models.UniqueConstraint(fields=('date', 'model', 'status', 'category', 'priority'), name='dailystats_key')],
+            },
+        ),
+        # Kept current as rows change from here on.
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
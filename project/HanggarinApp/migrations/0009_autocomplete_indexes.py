@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:21
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('HanggarinApp', '0008_rollups'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(django.db.models.functions.text.Lower('name'), models.F('id'), name='category_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='priority',
+            index=models.Index(django.db.models.functions.text.Lower('name'), models.F('id'), name='priority_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(django.db.models.functions.text.Lower('title'), models.F('id'), name='task_title_lower_idx'),
+        ),
+    ]
@@ -1,4 +1,7 @@
+from django.conf import settings
 from django.db import models
+from django.db.models.functions import Lower
+from django.utils import timezone
 
 
 class BaseModel(models.Model):
@@ -8,6 +11,17 @@ class BaseModel(models.Model):
     class Meta:
         abstract = True
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Signal handlers diff against this to see what a save changed.
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_values = {f.attname: getattr(self, f.attname) for f in self._meta.concrete_fields}
+
 
 STATUS_CHOICES = [
     ("Pending", "Pending"),
@@ -15,12 +29,37 @@ STATUS_CHOICES = [
     ("Completed", "Completed"),
 ]
 
+
+class CompletionMixin:
+    """Stamps completed_at when a save moves the row to Completed and clears it
+    when it leaves; queryset updates set it themselves."""
+
+    def stamp_completion(self):
+        """Set completed_at for the current status; bulk_create() callers
+        call this themselves."""
+        if self.status == "Completed":
+            self.completed_at = self.completed_at or timezone.now()
+        else:
+            self.completed_at = None
+
+    def save(self, *args, **kwargs):
+        self.stamp_completion()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'status' in update_fields and 'completed_at' not in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'completed_at']
+        super().save(*args, **kwargs)
+
 class Category(BaseModel):
     name = models.CharField(max_length=100)
 
     class Meta:
         verbose_name = "Category"
         verbose_name_plural = "Categories" 
+        indexes = [
+            models.Index(fields=['name', 'id'], name='category_name_idx'),
+            models.Index(Lower('name'), 'id', name='category_name_lower_idx'),
+            models.Index(fields=['updated_at'], name='category_updated_idx'),
+        ]
     def __str__(self):
         return self.name
 
@@ -31,27 +70,79 @@ class Priority(BaseModel):
     class Meta:
         verbose_name = "Priority"
         verbose_name_plural = "Priorities"  
+        indexes = [
+            models.Index(fields=['name', 'id'], name='priority_name_idx'),
+            models.Index(Lower('name'), 'id', name='priority_name_lower_idx'),
+            models.Index(fields=['updated_at'], name='priority_updated_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
 
-class Task(BaseModel):
+class Task(CompletionMixin, BaseModel):
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
     status = models.CharField(max_length=50, choices=STATUS_CHOICES, default="Pending")
+    completed_at = models.DateTimeField(null=True, blank=True, editable=False)
     deadline = models.DateTimeField(null=True, blank=True)
     priority = models.ForeignKey(Priority, on_delete=models.CASCADE, related_name='tasks')
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='tasks')
+    # Maintained by HanggarinApp.counters; repair drift with manage.py recount.
+    subtask_count = models.PositiveIntegerField(default=0, editable=False)
+    subtask_completed_count = models.PositiveIntegerField(default=0, editable=False)
+    note_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        # Each sortable column is paired with id so keyset pages can walk the
+        # index; (status, deadline) also serves status filters. updated_at
+        # backs the list ETags and finding rows touched by a bulk UPDATE.
+        indexes = [
+            models.Index(fields=['title', 'id'], name='task_title_idx'),
+            models.Index(Lower('title'), 'id', name='task_title_lower_idx'),
+            models.Index(fields=['status', 'id'], name='task_status_idx'),
+            models.Index(fields=['status', 'deadline'], name='task_status_deadline_idx'),
+            models.Index(fields=['deadline', 'id'], name='task_deadline_idx'),
+            models.Index(fields=['created_at', 'id'], name='task_created_idx'),
+            models.Index(fields=['updated_at'], name='task_updated_idx'),
+        ]
+
+    COUNTER_FIELDS = ('subtask_count', 'subtask_completed_count', 'note_count')
+
+    def save(self, *args, **kwargs):
+        # The counters are only written through F() updates; a plain save of
+        # a loaded task must not overwrite them with stale values.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.title
 
+    @property
+    def progress_percent(self):
+        if not self.subtask_count:
+            return 0
+        return self.subtask_completed_count * 100 // self.subtask_count
+
 
-class SubTask(BaseModel):
+class SubTask(CompletionMixin, BaseModel):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='subtasks')
     title = models.CharField(max_length=200)
     status = models.CharField(max_length=50, choices=STATUS_CHOICES, default="Pending")
+    completed_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['task', 'created_at'], name='subtask_task_created_idx'),
+            models.Index(fields=['title', 'id'], name='subtask_title_idx'),
+            models.Index(fields=['status', 'id'], name='subtask_status_idx'),
+            models.Index(fields=['created_at', 'id'], name='subtask_created_idx'),
+            models.Index(fields=['updated_at'], name='subtask_updated_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -61,6 +152,109 @@ class Note(BaseModel):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='notes')
     content = models.TextField()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['task', 'created_at'], name='note_task_created_idx'),
+            models.Index(fields=['created_at', 'id'], name='note_created_idx'),
+            models.Index(fields=['updated_at'], name='note_updated_idx'),
+        ]
+
     def __str__(self):
         return f"Note for {self.task.title} ({self.created_at:%Y-%m-%d})"
 
+
+class Tombstone(models.Model):
+    """A deleted row, kept so delta sync (HanggarinApp.sync) can tell clients."""
+    model = models.CharField(max_length=20)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} deleted {self.deleted_at:%Y-%m-%d %H:%M}"
+
+
+class DailyStats(models.Model):
+    """Per-day counts behind the dashboard trends (HanggarinApp.rollups).
+
+    Each row counts the rows of ``model`` with the given current status,
+    category and priority that were created, completed, or are due (open
+    tasks by deadline) on ``date``. Only tasks carry a category and priority;
+    0 stands for none so the key stays unique.
+    """
+    date = models.DateField()
+    model = models.CharField(max_length=20)
+    status = models.CharField(max_length=50, blank=True)
+    category = models.IntegerField(default=0)
+    priority = models.IntegerField(default=0)
+    created = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    due = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'model', 'status', 'category', 'priority'],
+                                    name='dailystats_key'),
+        ]
+        verbose_name_plural = 'daily stats'
+
+    def __str__(self):
+        return f"{self.model} {self.status or '-'} on {self.date}"
+
+
+class Job(models.Model):
+    """A unit of background work, run by ``manage.py run_workers`` (HanggarinApp.jobs)."""
+    QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+    STATUS_CHOICES = [(QUEUED, 'Queued'), (RUNNING, 'Running'), (DONE, 'Done'), (FAILED, 'Failed')]
+
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    # Not claimed before this; retries push it out with backoff.
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    progress_done = models.PositiveBigIntegerField(default=0)
+    progress_total = models.PositiveBigIntegerField(default=0)
+    message = models.CharField(max_length=200, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL,
+                                   related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # Workers claim the oldest due job of a status.
+            models.Index(fields=['status', 'run_after', 'id'], name='job_claim_idx'),
+            models.Index(fields=['created_at', 'id'], name='job_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+    @property
+    def progress_percent(self):
+        if not self.progress_total:
+            return 100 if self.status == self.DONE else 0
+        return min(self.progress_done * 100 // self.progress_total, 100)
+
+    def report(self, done, total=None, message=None):
+        """Record progress without touching the rest of the row; False once
+        this attempt was taken for dead and the job is no longer its own."""
+        fields = {'progress_done': done, 'updated_at': timezone.now()}
+        self.progress_done = done
+        if total is not None:
+            fields['progress_total'] = self.progress_total = total
+        if message is not None:
+            fields['message'] = self.message = message[:200]
+        return bool(Job.objects.filter(pk=self.pk, status=Job.RUNNING, locked_by=self.locked_by).update(**fields))
@@ -0,0 +1,255 @@
+from datetime import date, datetime
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import F, Q
+from django.utils.functional import cached_property
+
+CURSOR_SALT = 'hanggarin.cursor'
+
+
+def estimate_count(queryset):
+    """Return a cheap row estimate for an unfiltered queryset, else None."""
+    if queryset.query.where:
+        return None
+    table = queryset.model._meta.db_table
+    connection = connections[queryset.db]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE relname = %s', [table])
+            row = cursor.fetchone()
+            if row and row[0] >= 0:
+                return row[0]
+        elif connection.vendor == 'sqlite':
+            try:
+                cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [table])
+            except Exception:
+                return None
+            row = cursor.fetchone()
+            if row:
+                return int(row[0].split()[0])
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that skips COUNT(*) on large unfiltered tables.
+
+    Below ``HANGGARIN_ESTIMATED_COUNT_THRESHOLD`` rows (or when no estimate is
+    available) the exact count is used, so small tables never lose pages.
+    """
+
+    @cached_property
+    def count(self):
+        if hasattr(self.object_list, 'query'):
+            estimate = estimate_count(self.object_list)
+            if estimate is not None and estimate >= getattr(settings, 'HANGGARIN_ESTIMATED_COUNT_THRESHOLD', 10000):
+                return estimate
+        return super().count
+
+
+def _resolve_field(model, path):
+    field = None
+    for part in path.split('__'):
+        field = model._meta.get_field(part)
+        if field.is_relation:
+            model = field.related_model
+    return field
+
+
+class CursorPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None, count=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.count = count
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginationMixin:
+    """Keyset pagination for ListViews keyed on the active ordering plus pk.
+
+    Enabled with ``cursor_pagination = True`` on the view, the
+    ``HANGGARIN_CURSOR_PAGINATION`` setting, or a ``cursor`` query parameter.
+    Orderings that are not plain columns (e.g. search rank) fall back to the
+    offset paginator.
+    """
+    cursor_pagination = False
+    cursor_count = 'approximate'
+    cursor_query_param = 'cursor'
+
+    def use_cursor_pagination(self):
+        return (
+            self.cursor_pagination
+            or getattr(settings, 'HANGGARIN_CURSOR_PAGINATION', False)
+            or self.cursor_query_param in self.request.GET
+        )
+
+    def get_cursor_ordering(self, queryset):
+        ordering = self.get_ordering()
+        if isinstance(ordering, (list, tuple)):
+            if len(ordering) != 1:
+                return None
+            ordering = ordering[0]
+        if not isinstance(ordering, str):
+            return None
+        name = ordering.lstrip('-')
+        if name in queryset.query.annotations:
+            return ordering
+        try:
+            _resolve_field(queryset.model, name)
+        except Exception:
+            return None
+        return ordering
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_cursor_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        ordering = self.get_cursor_ordering(queryset)
+        if ordering is None:
+            return super().paginate_queryset(queryset, page_size)
+        page = self.paginate_by_cursor(queryset, ordering, page_size)
+        return (None, page, page.object_list, page.has_other_pages())
+
+    def paginate_by_cursor(self, queryset, ordering, page_size):
+        queryset, token = self.cursor_queryset(queryset, ordering)
+        rows = list(queryset[:page_size + 1])
+        count = None
+        if self.cursor_count == 'approximate':
+            count = estimate_count(self.get_queryset())
+        elif self.cursor_count == 'exact':
+            count = self.get_queryset().count()
+        return self.cursor_page(rows, ordering, token, page_size, count)
+
+    async def apaginate_by_cursor(self, queryset, ordering, page_size):
+        queryset, token = self.cursor_queryset(queryset, ordering)
+        rows = [obj async for obj in queryset[:page_size + 1]]
+        count = None
+        if self.cursor_count == 'approximate':
+            count = await sync_to_async(estimate_count)(self.get_queryset())
+        elif self.cursor_count == 'exact':
+            count = await self.get_queryset().acount()
+        return self.cursor_page(rows, ordering, token, page_size, count)
+
+    def cursor_queryset(self, queryset, ordering):
+        """The page query for the request's cursor, and the token it used."""
+        descending = ordering.startswith('-')
+        name = ordering.lstrip('-')
+        nullable = self._is_nullable(queryset, name)
+        token = self._decode(self.request.GET.get(self.cursor_query_param), ordering)
+        backwards = bool(token and token.get('b'))
+
+        # Walking backwards flips the ordering and the keyset comparison.
+        forward_desc = descending != backwards
+        queryset = queryset.order_by(*self._order_by(name, forward_desc, nullable))
+        if token:
+            try:
+                value = self._from_token(queryset, name, token['v'])
+            except ValidationError:
+                token = None
+                queryset = queryset.order_by(*self._order_by(name, descending, nullable))
+            else:
+                queryset = queryset.filter(self._after(name, value, token['pk'], forward_desc, nullable))
+        return queryset, token
+
+    def cursor_page(self, rows, ordering, token, page_size, count):
+        backwards = bool(token and token.get('b'))
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if backwards:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_more or backwards:
+                next_cursor = self._encode(ordering, rows[-1], backwards=False)
+            if token and (has_more or not backwards):
+                previous_cursor = self._encode(ordering, rows[0], backwards=True)
+        return CursorPage(rows, next_cursor, previous_cursor, count)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['cursor_pagination'] = isinstance(context.get('page_obj'), CursorPage)
+        return context
+
+    def _is_nullable(self, queryset, name):
+        if name in queryset.query.annotations:
+            return False
+        return _resolve_field(queryset.model, name).null or self._path_nullable(queryset.model, name)
+
+    def _path_nullable(self, model, path):
+        for part in path.split('__')[:-1]:
+            field = model._meta.get_field(part)
+            if field.null:
+                return True
+            model = field.related_model
+        return False
+
+    def _order_by(self, name, descending, nullable):
+        if descending:
+            expression = F(name).desc(nulls_last=True) if nullable else F(name).desc()
+            return [expression, '-pk']
+        expression = F(name).asc(nulls_first=True) if nullable else F(name).asc()
+        return [expression, 'pk']
+
+    def _after(self, name, value, pk, descending, nullable):
+        # NULLs sort first ascending and last descending.
+        op = 'lt' if descending else 'gt'
+        pk_after = Q(**{f'pk__{op}': pk})
+        if value is None:
+            same = Q(**{f'{name}__isnull': True}) & pk_after
+            return same if descending else same | Q(**{f'{name}__isnull': False})
+        condition = Q(**{f'{name}__{op}': value}) | (Q(**{name: value}) & pk_after)
+        if nullable and descending:
+            condition |= Q(**{f'{name}__isnull': True})
+        return condition
+
+    def _value_of(self, obj, name):
+        value = obj
+        for part in name.split('__'):
+            value = getattr(value, part, None)
+            if value is None:
+                return None
+        return value
+
+    def _encode(self, ordering, obj, backwards):
+        value = self._value_of(obj, ordering.lstrip('-'))
+        if isinstance(value, (datetime, date)):
+            value = value.isoformat()
+        payload = {'o': ordering, 'v': value, 'pk': obj.pk}
+        if backwards:
+            payload['b'] = 1
+        return signing.dumps(payload, salt=CURSOR_SALT, compress=True)
+
+    def _decode(self, token, ordering):
+        if not token:
+            return None
+        try:
+            payload = signing.loads(token, salt=CURSOR_SALT)
+        except signing.BadSignature:
+            return None
+        if not isinstance(payload, dict) or payload.get('o') != ordering or 'pk' not in payload:
+            return None
+        return payload
+
+    def _from_token(self, queryset, name, raw):
+        if raw is None or name in queryset.query.annotations:
+            return raw
+        return _resolve_field(queryset.model, name).to_python(raw)
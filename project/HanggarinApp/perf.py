@@ -0,0 +1,138 @@
+import math
+import threading
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.conf import settings
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of ``values`` (0 for an empty sequence)."""
+    if not values:
+        return 0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+@contextmanager
+def seeded_test_db(options, stdout, what='benchmark'):
+    """Run the block on a throwaway test database seeded from the command's options."""
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    from HanggarinApp.models import Task
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+    try:
+        if not (options['keepdb'] and Task.objects.exists()):
+            stdout.write(f'Seeding {what} data...')
+            call_command(
+                'create_initial_data_',
+                tasks=options['tasks'], subtasks=options['subtasks'], notes=options['notes'],
+                seed=options['seed'], stdout=stdout,
+            )
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+        teardown_test_environment()
+
+
+class RequestMetrics:
+    """Callable for ``connection.execute_wrapper`` that counts and times queries."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.wall_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += perf_counter() - start
+            self.queries += 1
+
+    def as_dict(self):
+        return {
+            'queries': self.queries,
+            'db_ms': round(self.db_time * 1000, 2),
+            'render_ms': round(self.render_time * 1000, 2),
+            'wall_ms': round(self.wall_time * 1000, 2),
+        }
+
+
+# The metrics of the request being served. A ContextVar rather than a
+# per-request execute_wrapper: under ASGI the ORM runs in sync_to_async worker
+# threads, whose thread-local connections the middleware never sees, but the
+# context (and so this variable) is copied into them.
+_current = ContextVar('hanggarin_request_metrics', default=None)
+
+
+def count_queries(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def instrument(connection):
+    """Install count_queries on ``connection`` (idempotent)."""
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_queries)
+
+
+@contextmanager
+def measuring(metrics):
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+class PerfStore:
+    """Rolling per-URL-name window of request metrics for this process."""
+
+    def __init__(self, window=None):
+        self.window = window
+        self._samples = defaultdict(self._new_window)
+        self._lock = threading.Lock()
+
+    def _new_window(self):
+        return deque(maxlen=self.window or getattr(settings, 'HANGGARIN_PERF_WINDOW', 500))
+
+    def record(self, url_name, metrics):
+        with self._lock:
+            self._samples[url_name].append(metrics.as_dict())
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+    def summary(self):
+        with self._lock:
+            snapshot = {name: list(samples) for name, samples in self._samples.items()}
+        result = {}
+        for name, samples in sorted(snapshot.items()):
+            wall = [s['wall_ms'] for s in samples]
+            db = [s['db_ms'] for s in samples]
+            queries = [s['queries'] for s in samples]
+            result[name] = {
+                'requests': len(samples),
+                'wall_ms': {p: percentile(wall, p) for p in (50, 95, 99)},
+                'db_ms': {p: percentile(db, p) for p in (50, 95, 99)},
+                'queries': {50: percentile(queries, 50), 95: percentile(queries, 95), 'max': max(queries)},
+            }
+        return result
+
+
+store = PerfStore()
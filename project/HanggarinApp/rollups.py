@@ -0,0 +1,158 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import connections, router, transaction
+from django.db.models import CharField, Count, F, IntegerField, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from HanggarinApp.models import Task, SubTask, Note, DailyStats, Job
+
+COMPLETED = 'Completed'
+COLUMNS = ('created', 'completed', 'due')
+KEY = ('date', 'model', 'status', 'category', 'priority')
+# What a row contributes depends only on these values, so a save that leaves
+# them alone costs nothing and any change is the old contribution taken away
+# and the new one added.
+FIELDS = {
+    Task: ('created_at', 'status', 'completed_at', 'deadline', 'category_id', 'priority_id'),
+    SubTask: ('created_at', 'status', 'completed_at'),
+    Note: ('created_at',),
+}
+MODELS = tuple(FIELDS)
+TREND_DAYS = (30, 90, 365)
+
+UPSERT_SQL = (
+    'INSERT INTO {table} ({key}, {columns}) VALUES ({placeholders}) '
+    'ON CONFLICT ({key}) DO UPDATE SET {increments}'
+)
+
+
+def row_deltas(model, values, sign, deltas):
+    """Add ``sign`` times the contribution of one row (its FIELDS in
+    ``values``) to ``deltas``, a dict of key -> [created, completed, due]."""
+    status = values.get('status', '')
+    rest = (model._meta.model_name, status, values.get('category_id') or 0, values.get('priority_id') or 0)
+    deltas[(timezone.localdate(values['created_at']), *rest)][0] += sign
+    if values.get('completed_at'):
+        deltas[(timezone.localdate(values['completed_at']), *rest)][1] += sign
+    if values.get('deadline') and status != COMPLETED:
+        deltas[(timezone.localdate(values['deadline']), *rest)][2] += sign
+    return deltas
+
+
+def new_deltas():
+    return defaultdict(lambda: [0, 0, 0])
+
+
+def queryset_deltas(queryset, sign, deltas=None):
+    """row_deltas() for every row of ``queryset``, grouped in the database."""
+    deltas = new_deltas() if deltas is None else deltas
+    model = queryset.model
+    # From the primary: these bracket writes, and a replica may lag behind.
+    queryset = queryset.using(router.db_for_write(model)).order_by()
+    group = {'s': Value('', output_field=CharField()), 'c': Value(0, output_field=IntegerField()),
+             'p': Value(0, output_field=IntegerField())}
+    if 'status' in FIELDS[model]:
+        group['s'] = F('status')
+    if 'category_id' in FIELDS[model]:
+        group['c'], group['p'] = Coalesce('category_id', 0), Coalesce('priority_id', 0)
+    sources = [(0, 'created_at', queryset)]
+    if 'completed_at' in FIELDS[model]:
+        sources.append((1, 'completed_at', queryset.filter(completed_at__isnull=False)))
+    if 'deadline' in FIELDS[model]:
+        sources.append((2, 'deadline', queryset.filter(deadline__isnull=False).exclude(status=COMPLETED)))
+    name = model._meta.model_name
+    for column, field, rows in sources:
+        for row in rows.values(day=TruncDate(field), **group).annotate(n=Count('pk')):
+            deltas[(row['day'], name, row['s'], row['c'], row['p'])][column] += sign * row['n']
+    return deltas
+
+
+def apply(deltas):
+    """Add ``deltas`` onto DailyStats in one executemany of upserts."""
+    rows = [(*key, *counts) for key, counts in deltas.items() if any(counts)]
+    if not rows:
+        return 0
+    connection = connections[router.db_for_write(DailyStats)]
+    qn = connection.ops.quote_name
+    table = qn(DailyStats._meta.db_table)
+    sql = UPSERT_SQL.format(
+        table=table,
+        key=', '.join(qn(name) for name in KEY),
+        columns=', '.join(qn(name) for name in COLUMNS),
+        placeholders=', '.join(['%s'] * (len(KEY) + len(COLUMNS))),
+        increments=', '.join(f'{qn(name)} = {table}.{qn(name)} + EXCLUDED.{qn(name)}' for name in COLUMNS),
+    )
+    params = [(connection.ops.adapt_datefield_value(row[0]), *row[1:]) for row in rows]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, params)
+    return len(rows)
+
+
+def add(queryset):
+    """Count rows written without signals (bulk_create, raw inserts)."""
+    return apply(queryset_deltas(queryset, 1))
+
+
+def remove(queryset):
+    """Uncount rows about to be deleted without signals."""
+    return apply(queryset_deltas(queryset, -1))
+
+
+def rebuild():
+    """Recompute every DailyStats row from the tables; returns the row count."""
+    with transaction.atomic(using=router.db_for_write(DailyStats)):
+        DailyStats.objects.all().delete()
+        deltas = new_deltas()
+        for model in MODELS:
+            queryset_deltas(model.objects.all(), 1, deltas)
+        return apply(deltas)
+
+
+def schedule_rebuild():
+    """Queue a rebuild for a change whose old values are unknown, unless one is already waiting."""
+    if not Job.objects.filter(kind='rebuild_rollups', status=Job.QUEUED).exists():
+        Job.objects.create(kind='rebuild_rollups', max_attempts=1)
+
+
+def _trend_rows(today):
+    start = today - timedelta(days=max(TREND_DAYS) - 1)
+    return (
+        DailyStats.objects.filter(model='task', date__gte=start, date__lte=today)
+        .values('date').annotate(created=Sum('created'), completed=Sum('completed'), due=Sum('due'))
+        .order_by('date')
+    )
+
+
+def trends(today=None):
+    """Tasks created, completed and gone overdue per day over each of
+    TREND_DAYS, read off DailyStats; the 365-day series is summed by week.
+
+    A day's overdue count is the open tasks whose deadline fell on it.
+    """
+    today = today or timezone.localdate()
+    return _series({row['date']: row for row in _trend_rows(today)}, today)
+
+
+async def atrends(today=None):
+    today = today or timezone.localdate()
+    return _series({row['date']: row async for row in _trend_rows(today)}, today)
+
+
+def _series(by_date, today):
+    series = {}
+    for days in TREND_DAYS:
+        step = 7 if days > 90 else 1
+        points = {'labels': [], 'created': [], 'completed': [], 'overdue': []}
+        first = today - timedelta(days=days - 1)
+        for offset in range(0, days, step):
+            bucket = [first + timedelta(days=offset + i) for i in range(step)]
+            bucket = [day for day in bucket if day <= today]
+            rows = [by_date[day] for day in bucket if day in by_date]
+            points['labels'].append(bucket[0].isoformat())
+            points['created'].append(sum(row['created'] for row in rows))
+            points['completed'].append(sum(row['completed'] for row in rows))
+            points['overdue'].append(sum(row['due'] for row in rows if row['date'] < today))
+        series[days] = points
+    return series
@@ -0,0 +1,133 @@
+import itertools
+import os
+from contextvars import ContextVar
+from time import monotonic
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+APP_LABEL = 'HanggarinApp'
+PIN_COOKIE = 'hanggarin_primary'
+
+# Per request (or command): _pinned when the client wrote within the pin
+# window or is writing now, _wrote once this request has written. Either keeps
+# HanggarinApp reads on the primary.
+_pinned = ContextVar('hanggarin_pinned', default=False)
+_wrote = ContextVar('hanggarin_wrote', default=False)
+_round_robin = itertools.count()
+_lag_cache = {}
+
+
+def start_request(pinned):
+    """Reset the routing state for a new request; returns the reset tokens."""
+    return _pinned.set(pinned), _wrote.set(False)
+
+
+def end_request(tokens):
+    pinned, wrote = tokens
+    _pinned.reset(pinned)
+    _wrote.reset(wrote)
+
+
+def has_written():
+    return _wrote.get()
+
+
+def replica_aliases():
+    return [alias for alias in getattr(settings, 'HANGGARIN_REPLICAS', []) if alias in connections]
+
+
+def cache_timeout(timeout):
+    """``timeout`` for a cache entry built from reads in this context.
+
+    A replica read just after a write can still be stale while the write has
+    already bumped the cache version, so such entries only live as long as
+    replicas may lag.
+    """
+    if not replica_aliases() or _pinned.get() or _wrote.get():
+        return timeout
+    return min(timeout, getattr(settings, 'HANGGARIN_REPLICA_MAX_LAG', 30))
+
+
+def _sqlite_lag(primary, replica):
+    # Stand-in replicas are copies refreshed by `manage.py sync_replicas`; they
+    # are as far behind as the primary's newest write is ahead of the copy.
+    def mtime(path):
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return 0.0
+
+    name = str(primary.settings_dict['NAME'])
+    written = max(mtime(name), mtime(f'{name}-wal'))
+    return max(0.0, written - mtime(str(replica.settings_dict['NAME'])))
+
+
+def measure_lag(alias):
+    """Seconds ``alias`` is behind the primary (0 when unknown)."""
+    replica = connections[alias]
+    if replica.vendor == 'postgresql':
+        with replica.cursor() as cursor:
+            cursor.execute('SELECT COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)')
+            return float(cursor.fetchone()[0])
+    if replica.vendor == 'sqlite':
+        return _sqlite_lag(connections[DEFAULT_DB_ALIAS], replica)
+    return 0.0
+
+
+def replica_lag(alias):
+    ttl = getattr(settings, 'HANGGARIN_REPLICA_LAG_TTL', 5)
+    checked, lag = _lag_cache.get(alias, (None, 0.0))
+    if checked is None or monotonic() - checked > ttl:
+        lag = measure_lag(alias)
+        _lag_cache[alias] = (monotonic(), lag)
+    return lag
+
+
+def choose_replica(replicas):
+    if getattr(settings, 'HANGGARIN_REPLICA_SELECTION', 'round_robin') == 'least_lag':
+        max_lag = getattr(settings, 'HANGGARIN_REPLICA_MAX_LAG', 30)
+        lags = [(replica_lag(alias), alias) for alias in replicas]
+        lag, alias = min(lags)
+        # Every replica too far behind: the primary answers.
+        return alias if lag <= max_lag else DEFAULT_DB_ALIAS
+    return replicas[next(_round_robin) % len(replicas)]
+
+
+class ReplicaRouter:
+    """Send HanggarinApp reads to ``HANGGARIN_REPLICAS`` and everything else,
+    and every write, to the primary.
+
+    Other apps (auth, sessions, allauth) stay on the primary so logins and
+    session writes are never read back stale.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label != APP_LABEL:
+            return None
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            # Related lookups follow the object they start from.
+            return instance._state.db
+        replicas = replica_aliases()
+        if not replicas or _pinned.get() or _wrote.get():
+            return DEFAULT_DB_ALIAS
+        return choose_replica(replicas)
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label == APP_LABEL:
+            # Reads later in the same request see this write.
+            _wrote.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary.
+        if db in replica_aliases():
+            return False
+        return None
@@ -0,0 +1,230 @@
+import re
+
+from django.db import connections, router
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from HanggarinApp.models import Category, Priority, Task, SubTask, Note
+
+
+def _table(model):
+    return f'"{model._meta.db_table}"'
+
+
+# Each searchable model gets one shadow table keyed by the model's pk, created
+# by migration 0002 (new documents need a migration of their own). The
+# columns are the text the list views used to match with icontains; ``fields``
+# keeps those lookups for backends without a full-text engine.
+DOCUMENTS = {
+    Task: {
+        'table': 'hanggarin_task_search',
+        'columns': [
+            ('title', 't.title', 10.0, 'A'),
+            ('description', 't.description', 1.0, 'C'),
+            ('status', 't.status', 2.0, 'B'),
+            ('priority', 'p.name', 2.0, 'B'),
+            ('category', 'c.name', 2.0, 'B'),
+        ],
+        'source': (
+            f'{_table(Task)} t'
+            f' JOIN {_table(Priority)} p ON p.id = t.priority_id'
+            f' JOIN {_table(Category)} c ON c.id = t.category_id'
+        ),
+        'fields': ['title', 'description', 'status', 'priority__name', 'category__name'],
+    },
+    SubTask: {
+        'table': 'hanggarin_subtask_search',
+        'columns': [
+            ('title', 't.title', 10.0, 'A'),
+            ('status', 't.status', 2.0, 'B'),
+            ('task', 'p.title', 2.0, 'B'),
+        ],
+        'source': f'{_table(SubTask)} t JOIN {_table(Task)} p ON p.id = t.task_id',
+        'fields': ['title', 'status', 'task__title'],
+    },
+    Note: {
+        'table': 'hanggarin_note_search',
+        'columns': [
+            ('content', 't.content', 10.0, 'A'),
+            ('task', 'p.title', 2.0, 'B'),
+        ],
+        'source': f'{_table(Note)} t JOIN {_table(Task)} p ON p.id = t.task_id',
+        'fields': ['content', 'task__title'],
+    },
+}
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+REINDEX_CHUNK = 500
+
+
+def _pk_in(pks):
+    """Yield (sql, params) for the inside of an ``IN (...)`` over ``pks``.
+
+    ``pks`` may be a QuerySet (compiled as a subquery) or an iterable of ids
+    (chunked to stay under parameter limits).
+    """
+    if hasattr(pks, 'query'):
+        sql, params = pks.values('pk').query.sql_with_params()
+        yield sql, list(params)
+        return
+    pks = list(pks)
+    for start in range(0, len(pks), REINDEX_CHUNK):
+        chunk = pks[start:start + REINDEX_CHUNK]
+        yield ', '.join(['%s'] * len(chunk)), chunk
+
+
+def _pk_filter(pks):
+    """Yield (sql, params) restricting ``t.id`` to ``pks`` (None: everything)."""
+    if pks is None:
+        yield '', []
+        return
+    for sql, params in _pk_in(pks):
+        yield f' WHERE t.id IN ({sql})', params
+
+
+class SearchBackend:
+    """Fallback for engines without full-text support: the old icontains scan."""
+    vendor = None
+    ranked = False
+
+    def reindex(self, connection, model, pks=None):
+        pass
+
+    def remove(self, connection, model, pks):
+        pass
+
+    def filter(self, queryset, q, ranked=True):
+        condition = Q()
+        for field in DOCUMENTS[queryset.model]['fields']:
+            condition |= Q(**{f'{field}__icontains': q})
+        return queryset.filter(condition)
+
+
+class SQLiteSearchBackend(SearchBackend):
+    vendor = 'sqlite'
+    ranked = True
+
+    def reindex(self, connection, model, pks=None):
+        doc = DOCUMENTS[model]
+        names = ', '.join(name for name, _, _, _ in doc['columns'])
+        values = ', '.join(f"COALESCE({expr}, '')" for _, expr, _, _ in doc['columns'])
+        with connection.cursor() as cursor:
+            for where, params in _pk_filter(pks):
+                if where:
+                    cursor.execute(
+                        f'DELETE FROM {doc["table"]} WHERE rowid IN (SELECT t.id FROM {doc["source"]}{where})',
+                        params,
+                    )
+                else:
+                    cursor.execute(f'DELETE FROM {doc["table"]}')
+                cursor.execute(
+                    f'INSERT INTO {doc["table"]} (rowid, {names}) SELECT t.id, {values} FROM {doc["source"]}{where}',
+                    params,
+                )
+
+    def remove(self, connection, model, pks):
+        table = DOCUMENTS[model]['table']
+        with connection.cursor() as cursor:
+            for sql, params in _pk_in(pks):
+                cursor.execute(f'DELETE FROM {table} WHERE rowid IN ({sql})', params)
+
+    def match_expression(self, q):
+        return ' '.join(f'"{token}"*' for token in TOKEN_RE.findall(q))
+
+    def filter(self, queryset, q, ranked=True):
+        expression = self.match_expression(q)
+        if not expression:
+            return queryset.none()
+        doc = DOCUMENTS[queryset.model]
+        table = doc['table']
+        if not ranked:
+            # A plain pk subquery stays valid when the queryset is itself used
+            # as a subquery, where extra() table references would not.
+            return queryset.filter(pk__in=RawSQL(f'SELECT rowid FROM {table} WHERE {table} MATCH %s', [expression]))
+        weights = ', '.join(str(weight) for _, _, weight, _ in doc['columns'])
+        queryset = queryset.extra(
+            select={'search_rank': f'bm25({table}, {weights})'},
+            tables=[table],
+            where=[f'{table} MATCH %s', f'{table}.rowid = {_table(queryset.model)}."id"'],
+            params=[expression],
+        )
+        # bm25() is lower for better matches.
+        return queryset.order_by('search_rank', 'pk')
+
+
+class PostgresSearchBackend(SearchBackend):
+    vendor = 'postgresql'
+    ranked = True
+    config = 'simple'
+
+    def document_sql(self, doc):
+        return ' || '.join(
+            f"setweight(to_tsvector('{self.config}', COALESCE({expr}, '')), '{label}')"
+            for _, expr, _, label in doc['columns']
+        )
+
+    def reindex(self, connection, model, pks=None):
+        doc = DOCUMENTS[model]
+        with connection.cursor() as cursor:
+            for where, params in _pk_filter(pks):
+                if not where:
+                    cursor.execute(f'TRUNCATE {doc["table"]}')
+                cursor.execute(
+                    f'INSERT INTO {doc["table"]} (id, document) '
+                    f'SELECT t.id, {self.document_sql(doc)} FROM {doc["source"]}{where} '
+                    f'ON CONFLICT (id) DO UPDATE SET document = EXCLUDED.document',
+                    params,
+                )
+
+    def remove(self, connection, model, pks):
+        with connection.cursor() as cursor:
+            for sql, params in _pk_in(pks):
+                cursor.execute(f'DELETE FROM {DOCUMENTS[model]["table"]} WHERE id IN ({sql})', params)
+
+    def match_expression(self, q):
+        return ' & '.join(f'{token}:*' for token in TOKEN_RE.findall(q))
+
+    def filter(self, queryset, q, ranked=True):
+        expression = self.match_expression(q)
+        if not expression:
+            return queryset.none()
+        table = DOCUMENTS[queryset.model]['table']
+        tsquery = f"to_tsquery('{self.config}', %s)"
+        if not ranked:
+            return queryset.filter(pk__in=RawSQL(f'SELECT id FROM {table} WHERE document @@ {tsquery}', [expression]))
+        queryset = queryset.extra(
+            select={'search_rank': f'ts_rank({table}.document, {tsquery})'},
+            select_params=[expression],
+            tables=[table],
+            where=[f'{table}.document @@ {tsquery}', f'{table}.id = {_table(queryset.model)}."id"'],
+            params=[expression],
+        )
+        return queryset.order_by('-search_rank', 'pk')
+
+
+BACKENDS = {backend.vendor: backend for backend in (SQLiteSearchBackend(), PostgresSearchBackend())}
+FALLBACK = SearchBackend()
+
+
+def get_backend(connection):
+    return BACKENDS.get(connection.vendor, FALLBACK)
+
+
+def search(queryset, q, ranked=True):
+    """Filter ``queryset`` to rows matching ``q``, best matches first when ``ranked``."""
+    return get_backend(connections[queryset.db]).filter(queryset, q, ranked=ranked)
+
+
+def reindex(model, pks=None):
+    connection = connections[router.db_for_write(model)]
+    get_backend(connection).reindex(connection, model, pks)
+
+
+def remove(model, pks):
+    connection = connections[router.db_for_write(model)]
+    get_backend(connection).remove(connection, model, pks)
+
+
+def rebuild():
+    for model in DOCUMENTS:
+        reindex(model)
@@ -0,0 +1,47 @@
+import hashlib
+import json
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.template.loader import get_template
+from django.templatetags.static import static
+from django.urls import reverse
+
+from HanggarinApp.assets import BUNDLES
+
+TEMPLATE = 'hanggarin/serviceworker.js'
+# Static files every page of base.html loads, besides the bundles.
+PRECACHE_STATIC = ['img/profile.jpg', 'img/profile2.jpg']
+# Entries kept per runtime cache before the least recently used is evicted.
+RUNTIME_LIMITS = {'static': 100, 'pages': 50, 'forms': 20}
+LIST_PAGES = ['home', 'category-list', 'priority-list', 'task-list', 'subtask-list', 'note-list']
+
+
+def precache_urls():
+    """Static URLs to precache, hashed when the manifest storage is in use."""
+    urls = []
+    for name in [*BUNDLES, *PRECACHE_STATIC]:
+        try:
+            urls.append(static(name))
+        except ValueError:  # not in the manifest: collectstatic has not run
+            continue
+    return urls + [reverse('offline')]
+
+
+def service_worker_context():
+    config = {
+        'precache': precache_urls(),
+        'offline': reverse('offline'),
+        'static': staticfiles_storage.base_url,
+        'lists': [reverse(name) for name in LIST_PAGES],
+        # Never cached: auth flows, admin, the sync API, downloads and the
+        # job pages (live status, export files).
+        'network': ['/accounts/', reverse('admin:index'), reverse('sync'), reverse('task-export'),
+                    reverse('perf-summary'), reverse('job-list')],
+        'limits': RUNTIME_LIMITS,
+    }
+    config = json.dumps(config, sort_keys=True)
+    source = get_template(TEMPLATE).template.source
+    # A new asset hash or worker change renames every cache, so activation
+    # drops the previous deploy's caches.
+    version = hashlib.sha256((config + source).encode()).hexdigest()[:12]
+    return {'config': config, 'version': version}
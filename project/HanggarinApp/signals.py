@@ -0,0 +1,164 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete
+
+from HanggarinApp import perf, rollups, search
+from HanggarinApp.cache import bump_version
+from HanggarinApp.counters import COMPLETED, adjust_task_counters, recount_task_counters
+from HanggarinApp.models import Category, Priority, Task, SubTask, Note, Tombstone
+from HanggarinApp.stats import DASHBOARD_NAMESPACE
+
+TRACKED_MODELS = (Category, Priority, Task, SubTask, Note)
+
+
+def invalidate_dashboard(sender, **kwargs):
+    # Each model also has its own namespace for caches built from its rows.
+    bump_version(DASHBOARD_NAMESPACE, sender._meta.model_name)
+
+
+for model in TRACKED_MODELS:
+    post_save.connect(invalidate_dashboard, sender=model, dispatch_uid=f'dashboard-save-{model._meta.model_name}')
+    post_delete.connect(invalidate_dashboard, sender=model, dispatch_uid=f'dashboard-delete-{model._meta.model_name}')
+
+
+# Search index: every document embeds its parent's name/title, so renaming a
+# Category, Priority or Task re-indexes the rows that point at it.
+
+def _changed(instance, attname):
+    loaded = getattr(instance, '_loaded_values', None)
+    return loaded is None or loaded.get(attname) != getattr(instance, attname)
+
+
+def index_task(sender, instance, created, **kwargs):
+    search.reindex(Task, [instance.pk])
+    if not created and _changed(instance, 'title'):
+        search.reindex(SubTask, SubTask.objects.filter(task_id=instance.pk))
+        search.reindex(Note, Note.objects.filter(task_id=instance.pk))
+
+
+def index_child(sender, instance, **kwargs):
+    search.reindex(sender, [instance.pk])
+
+
+def index_renamed_lookup(sender, instance, created, **kwargs):
+    if created or not _changed(instance, 'name'):
+        return
+    lookup = 'category_id' if sender is Category else 'priority_id'
+    search.reindex(Task, Task.objects.filter(**{lookup: instance.pk}))
+
+
+def unindex(sender, instance, **kwargs):
+    search.remove(sender, [instance.pk])
+
+
+for model in (Category, Priority):
+    post_save.connect(index_renamed_lookup, sender=model, dispatch_uid=f'search-rename-{model._meta.model_name}')
+post_save.connect(index_task, sender=Task, dispatch_uid='search-index-task')
+for model in (SubTask, Note):
+    post_save.connect(index_child, sender=model, dispatch_uid=f'search-index-{model._meta.model_name}')
+for model in (Task, SubTask, Note):
+    post_delete.connect(unindex, sender=model, dispatch_uid=f'search-remove-{model._meta.model_name}')
+
+
+# Task counters. Saves diff against the values the instance was loaded with;
+# an instance that was never loaded gets its task recounted instead.
+
+def count_subtask_save(sender, instance, created, **kwargs):
+    done = int(instance.status == COMPLETED)
+    if created:
+        adjust_task_counters(instance.task_id, subtasks=1, completed=done)
+        return
+    loaded = getattr(instance, '_loaded_values', None)
+    if loaded is None or 'task_id' not in loaded or 'status' not in loaded:
+        recount_task_counters(Task.objects.filter(pk=instance.task_id))
+        return
+    was_done = int(loaded['status'] == COMPLETED)
+    if loaded['task_id'] != instance.task_id:
+        adjust_task_counters(loaded['task_id'], subtasks=-1, completed=-was_done)
+        adjust_task_counters(instance.task_id, subtasks=1, completed=done)
+    elif was_done != done:
+        adjust_task_counters(instance.task_id, completed=done - was_done)
+
+
+def count_subtask_delete(sender, instance, **kwargs):
+    adjust_task_counters(instance.task_id, subtasks=-1, completed=-int(instance.status == COMPLETED))
+
+
+def count_note_save(sender, instance, created, **kwargs):
+    if created:
+        adjust_task_counters(instance.task_id, notes=1)
+        return
+    loaded = getattr(instance, '_loaded_values', None)
+    if loaded is None or 'task_id' not in loaded:
+        recount_task_counters(Task.objects.filter(pk=instance.task_id))
+    elif loaded['task_id'] != instance.task_id:
+        adjust_task_counters(loaded['task_id'], notes=-1)
+        adjust_task_counters(instance.task_id, notes=1)
+
+
+def count_note_delete(sender, instance, **kwargs):
+    adjust_task_counters(instance.task_id, notes=-1)
+
+
+post_save.connect(count_subtask_save, sender=SubTask, dispatch_uid='counters-subtask-save')
+post_delete.connect(count_subtask_delete, sender=SubTask, dispatch_uid='counters-subtask-delete')
+post_save.connect(count_note_save, sender=Note, dispatch_uid='counters-note-save')
+post_delete.connect(count_note_delete, sender=Note, dispatch_uid='counters-note-delete')
+
+
+# Delta sync only sees rows through updated_at; deletes leave a tombstone.
+# Cascades send post_delete for every collected row, so children are covered.
+
+def record_tombstone(sender, instance, **kwargs):
+    Tombstone.objects.create(model=sender._meta.model_name, object_id=instance.pk)
+
+
+for model in TRACKED_MODELS:
+    post_delete.connect(record_tombstone, sender=model, dispatch_uid=f'sync-tombstone-{model._meta.model_name}')
+
+
+# Dashboard rollups: a save moves the row's contribution from its loaded
+# values to its new ones. Bulk writes adjust them set-based (rollups.add/remove).
+
+def _rollup_values(sender, instance):
+    return {name: getattr(instance, name) for name in rollups.FIELDS[sender]}
+
+
+def rollup_save(sender, instance, created, **kwargs):
+    deltas = rollups.new_deltas()
+    if not created:
+        loaded = getattr(instance, '_loaded_values', None)
+        if loaded is None or not set(rollups.FIELDS[sender]) <= loaded.keys():
+            # Deferred fields: the old contribution is unknown.
+            rollups.schedule_rebuild()
+            return
+        rollups.row_deltas(sender, loaded, -1, deltas)
+    rollups.apply(rollups.row_deltas(sender, _rollup_values(sender, instance), 1, deltas))
+
+
+def rollup_delete(sender, instance, **kwargs):
+    rollups.apply(rollups.row_deltas(sender, _rollup_values(sender, instance), -1, rollups.new_deltas()))
+
+
+for model in rollups.MODELS:
+    post_save.connect(rollup_save, sender=model, dispatch_uid=f'rollup-save-{model._meta.model_name}')
+    post_delete.connect(rollup_delete, sender=model, dispatch_uid=f'rollup-delete-{model._meta.model_name}')
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in getattr(settings, 'HANGGARIN_SQLITE_PRAGMAS', {}).items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
+
+
+connection_created.connect(configure_sqlite, dispatch_uid='sqlite-pragmas')
+
+
+def instrument_connection(sender, connection, **kwargs):
+    # Every connection in every thread, replicas included; it only counts
+    # while QueryInstrumentationMiddleware is measuring a request.
+    perf.instrument(connection)
+
+
+connection_created.connect(instrument_connection, dispatch_uid='perf-instrument')
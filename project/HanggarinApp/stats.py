@@ -0,0 +1,80 @@
+import asyncio
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from HanggarinApp.cache import aget_version, get_version
+from HanggarinApp.models import Category, Priority, Task, SubTask, Note
+from HanggarinApp.rollups import atrends, trends
+from HanggarinApp.routers import cache_timeout
+
+DASHBOARD_NAMESPACE = 'dashboard'
+DASHBOARD_CACHE_KEY = 'hanggarin:dashboard:{version}:{day}'
+
+
+def _year_start(now):
+    return now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _aggregates(now):
+    # One query per table; the yearly counts use a created_at range so the
+    # index on created_at can serve them.
+    this_year = Q(created_at__gte=_year_start(now))
+    for name, model in (('categories', Category), ('priorities', Priority)):
+        yield name, model, {'total': Count('pk'), 'last': Max('updated_at')}
+    for name, model in (('tasks', Task), ('subtasks', SubTask), ('notes', Note)):
+        yield name, model, {'total': Count('pk'), 'this_year': Count('pk', filter=this_year), 'last': Max('updated_at')}
+
+
+def _stats(results):
+    stats = {}
+    for name, counts in results:
+        stats[f'total_{name}'] = counts['total']
+        if 'this_year' in counts:
+            stats[f'{name}_created_this_year'] = counts['this_year']
+    # Newest write across the tables, for Last-Modified on the dashboard.
+    changed = [counts['last'] for _, counts in results if counts['last']]
+    stats['last_modified'] = max(changed, default=None)
+    return stats
+
+
+def collect_dashboard_stats(now=None):
+    now = now or timezone.now()
+    stats = _stats([(name, model.objects.aggregate(**aggregates)) for name, model, aggregates in _aggregates(now)])
+    stats['trends'] = trends(timezone.localdate(now))
+    return stats
+
+
+async def acollect_dashboard_stats(now=None):
+    """collect_dashboard_stats() with the five table queries in flight at once."""
+    now = now or timezone.now()
+    specs = list(_aggregates(now))
+    results = await asyncio.gather(
+        *(model.objects.aaggregate(**aggregates) for _, model, aggregates in specs),
+        atrends(timezone.localdate(now)),
+    )
+    stats = _stats([(name, counts) for (name, _, _), counts in zip(specs, results)])
+    stats['trends'] = results[-1]
+    return stats
+
+
+def get_dashboard_stats(now=None):
+    now = now or timezone.now()
+    key = DASHBOARD_CACHE_KEY.format(version=get_version(DASHBOARD_NAMESPACE), day=timezone.localdate(now))
+    stats = cache.get(key)
+    if stats is None:
+        stats = collect_dashboard_stats(now)
+        cache.set(key, stats, cache_timeout(getattr(settings, 'HANGGARIN_DASHBOARD_CACHE_TIMEOUT', 300)))
+    return stats
+
+
+async def aget_dashboard_stats(now=None):
+    now = now or timezone.now()
+    key = DASHBOARD_CACHE_KEY.format(version=await aget_version(DASHBOARD_NAMESPACE), day=timezone.localdate(now))
+    stats = await cache.aget(key)
+    if stats is None:
+        stats = await acollect_dashboard_stats(now)
+        await cache.aset(key, stats, cache_timeout(getattr(settings, 'HANGGARIN_DASHBOARD_CACHE_TIMEOUT', 300)))
+    return stats
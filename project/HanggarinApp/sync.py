@@ -0,0 +1,146 @@
+import heapq
+from datetime import timedelta
+from operator import itemgetter
+
+from django.conf import settings
+from django.core import signing
+from django.db import DEFAULT_DB_ALIAS, connections, router
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from HanggarinApp.models import Category, Priority, Task, SubTask, Note, Tombstone
+
+SYNC_SALT = 'hanggarin.sync'
+
+# Columns sent per model, as positional rows under one field list. The task
+# counters are left out: clients derive them from the subtasks and notes they
+# hold, and recounts do not stamp updated_at.
+SYNC_FIELDS = {
+    Category: ('id', 'name', 'updated_at'),
+    Priority: ('id', 'name', 'updated_at'),
+    Task: ('id', 'title', 'description', 'status', 'deadline', 'priority_id', 'category_id',
+           'created_at', 'updated_at'),
+    SubTask: ('id', 'task_id', 'title', 'status', 'created_at', 'updated_at'),
+    Note: ('id', 'task_id', 'content', 'created_at', 'updated_at'),
+}
+# A cursor is (updated_at, stream, pk); the stream's position here breaks
+# updated_at ties between tables, with tombstones last.
+STREAMS = list(SYNC_FIELDS)
+TOMBSTONES = len(STREAMS)
+
+
+class CursorExpired(ValueError):
+    """The cursor predates the tombstones still kept; the client must resync."""
+
+
+def encode_cursor(key):
+    moment, stream, pk = key
+    return signing.dumps([moment.isoformat(), stream, pk], salt=SYNC_SALT)
+
+
+def decode_cursor(token):
+    """The ``(updated_at, stream, pk)`` key in ``token``; None for a first sync."""
+    if not token:
+        return None
+    try:
+        moment, stream, pk = signing.loads(token, salt=SYNC_SALT)
+        moment = parse_datetime(moment)
+    except (signing.BadSignature, TypeError, ValueError):
+        raise ValueError('Invalid sync cursor.')
+    if moment is None or not isinstance(stream, int) or not isinstance(pk, int):
+        raise ValueError('Invalid sync cursor.')
+    return moment, stream, pk
+
+
+def _after(field, cursor, stream):
+    if cursor is None:
+        return Q()
+    moment, cursor_stream, pk = cursor
+    if stream > cursor_stream:
+        return Q(**{f'{field}__gte': moment})
+    if stream < cursor_stream:
+        return Q(**{f'{field}__gt': moment})
+    return Q(**{f'{field}__gt': moment}) | Q(**{field: moment, 'pk__gt': pk})
+
+
+def _stream(queryset, field, cursor, stream, horizon, limit):
+    # Reads stay on the primary: a lagging replica would let the cursor move
+    # past rows it has not replayed yet.
+    return (
+        queryset.using(DEFAULT_DB_ALIAS)
+        .filter(_after(field, cursor, stream), **{f'{field}__lte': horizon})
+        .order_by(field, 'pk')[:limit]
+    )
+
+
+def changes_since(cursor=None, limit=None, now=None):
+    """The next batch of at most ``limit`` changes after ``cursor``.
+
+    Rows and tombstones from every table are merged in ``(updated_at, stream,
+    pk)`` order, reading ``limit + 1`` per table off the updated_at indexes.
+    Only changes older than HANGGARIN_SYNC_SETTLE_SECONDS are sent, so a
+    transaction that stamped updated_at before a later one committed is not
+    skipped over. Raises CursorExpired when tombstones the client may need
+    have been pruned.
+    """
+    limit = limit or settings.HANGGARIN_SYNC_BATCH_SIZE
+    now = now or timezone.now()
+    if cursor is not None and cursor[0] < now - timedelta(days=settings.HANGGARIN_SYNC_RETENTION_DAYS):
+        raise CursorExpired('Sync cursor expired; sync again from the start.')
+    horizon = now - timedelta(seconds=settings.HANGGARIN_SYNC_SETTLE_SECONDS)
+
+    streams = []
+    for stream, model in enumerate(STREAMS):
+        fields = SYNC_FIELDS[model]
+        at = fields.index('updated_at')
+        rows = _stream(model.objects.values_list(*fields), 'updated_at', cursor, stream, horizon, limit + 1)
+        streams.append([((row[at], stream, row[0]), row) for row in rows])
+    rows = _stream(Tombstone.objects.values_list('deleted_at', 'pk', 'model', 'object_id'),
+                   'deleted_at', cursor, TOMBSTONES, horizon, limit + 1)
+    streams.append([((deleted_at, TOMBSTONES, pk), (model, object_id)) for deleted_at, pk, model, object_id in rows])
+
+    merged = list(heapq.merge(*streams, key=itemgetter(0)))
+    batch = merged[:limit]
+    more = len(merged) > limit
+    changes, deleted = {}, {}
+    for (_, stream, _), row in batch:
+        if stream == TOMBSTONES:
+            deleted.setdefault(row[0], []).append(row[1])
+        else:
+            model = STREAMS[stream]
+            changes.setdefault(model._meta.model_name, {'fields': SYNC_FIELDS[model], 'rows': []})['rows'].append(row)
+    if more:
+        position = batch[-1][0]
+    else:
+        # Caught up: everything up to the horizon has been sent, so an idle
+        # client's cursor keeps moving and does not expire.
+        position = (horizon, TOMBSTONES + 1, 0)
+        if cursor is not None and cursor > position:
+            position = cursor
+    return {'cursor': encode_cursor(position), 'more': more, 'changes': changes, 'deleted': deleted}
+
+
+def record_tombstones(queryset, now=None):
+    """Tombstone every row of ``queryset`` in one INSERT ... SELECT.
+
+    For deletes that bypass post_delete; run it before the rows go.
+    """
+    connection = connections[router.db_for_write(Tombstone)]
+    qn = connection.ops.quote_name
+    sql, params = queryset.values('id').query.sql_with_params()
+    deleted_at = connection.ops.adapt_datetimefield_value(now or timezone.now())
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {qn(Tombstone._meta.db_table)} ({qn("model")}, {qn("object_id")}, {qn("deleted_at")}) '
+            f'SELECT %s, deleted.{qn("id")}, %s FROM ({sql}) deleted',
+            [queryset.model._meta.model_name, deleted_at, *params],
+        )
+
+
+def prune_tombstones(days=None):
+    """Delete tombstones older than the retention window; returns how many."""
+    days = settings.HANGGARIN_SYNC_RETENTION_DAYS if days is None else days
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
@@ -1,56 +1,171 @@
-from django.shortcuts import render
-from django.views.generic import ListView, TemplateView
+import io
+import os
+import tempfile
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib import messages
+from django.shortcuts import get_object_or_404, redirect, render
+from django.views.generic import FormView, ListView, TemplateView
 from django.views.generic.edit import CreateView, UpdateView, DeleteView
-from HanggarinApp.models import Task, Category, Priority, SubTask, Note
-from django.urls import reverse_lazy
-from django.db.models import Q
+from HanggarinApp.models import Task, Category, Priority, SubTask, Note, Job
+from django.urls import reverse, reverse_lazy
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.http import FileResponse, Http404, HttpRequest, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.db.models.functions import Lower
 from django.utils import timezone
-from django.contrib.auth.mixins import LoginRequiredMixin
-
-class HomePageView(LoginRequiredMixin, ListView):
-    model = Task
-    context_object_name = 'home'
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.decorators import method_decorator
+from django.utils.http import quote_etag
+from django.views import View
+from django.views.decorators.cache import never_cache
+from django.views.decorators.gzip import gzip_page
+from HanggarinApp.bulk import update_subtasks, update_tasks
+from HanggarinApp.cache import CachedTableMixin
+from HanggarinApp.conditional import ConditionalDashboardMixin, ConditionalListMixin
+from HanggarinApp.counters import PROGRESS
+from HanggarinApp.deletes import delete_tree, tree_size
+from HanggarinApp.exports import FORMATS, export_tasks
+from HanggarinApp.forms import BulkSubTaskForm, BulkTaskForm, ImportForm, NoteForm, SubTaskForm, TaskForm
+from HanggarinApp.imports import import_tasks
+from HanggarinApp.jobs import enqueue
+from HanggarinApp.pagination import CursorPaginationMixin
+from HanggarinApp.perf import store as perf_store
+from HanggarinApp.search import search
+from HanggarinApp.serviceworker import TEMPLATE as SERVICE_WORKER_TEMPLATE, service_worker_context
+from HanggarinApp.stats import get_dashboard_stats
+from HanggarinApp.sync import CursorExpired, changes_since, decode_cursor
+
+class HomePageView(LoginRequiredMixin, ConditionalDashboardMixin, TemplateView):
     template_name = 'home.html'
 
+    def get_stats(self):
+        return get_dashboard_stats()
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        stats = self.get_stats()
+        context.update(stats)
 
        
-        context['total_categories'] = Category.objects.count()
-        context['total_priorities'] = Priority.objects.count()
-        context['total_tasks'] = Task.objects.count()
-        context['total_subtasks'] = SubTask.objects.count()
-        context['total_notes'] = Note.objects.count()
+        context['categories_count'] = stats['total_categories']
+        context['priorities_count'] = stats['total_priorities']
+        context['tasks_count'] = stats['total_tasks']
+        context['subtasks_count'] = stats['total_subtasks']
+        context['notes_count'] = stats['total_notes']
+
+        return context
 
-       
-        context['categories_count'] = context['total_categories']
-        context['priorities_count'] = context['total_priorities']
-        context['tasks_count'] = context['total_tasks']
-        context['subtasks_count'] = context['total_subtasks']
-        context['notes_count'] = context['total_notes']
 
-       
-        today = timezone.now().date()
-        year = today.year
-        context['tasks_created_this_year'] = Task.objects.filter(created_at__year=year).count()
-        context['subtasks_created_this_year'] = SubTask.objects.filter(created_at__year=year).count()
-        context['notes_created_this_year'] = Note.objects.filter(created_at__year=year).count()
 
+class StaffRequiredMixin(LoginRequiredMixin, UserPassesTestMixin):
+    def test_func(self):
+        return self.request.user.is_staff
+
+
+class PerfSummaryView(StaffRequiredMixin, View):
+    def get(self, request, *args, **kwargs):
+        return JsonResponse({'views': perf_store.summary()})
+
+
+class TreeDeleteMixin:
+    """Delete the object and its cascade set-based (HanggarinApp.deletes);
+    trees above HANGGARIN_INLINE_DELETE_LIMIT rows become a background job."""
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['tree'] = tree_size(self.object)
         return context
 
+    def form_valid(self, form):
+        success_url = self.get_success_url()
+        size = tree_size(self.object)
+        if size['total'] > settings.HANGGARIN_INLINE_DELETE_LIMIT:
+            job = enqueue('delete_tree', self.request.user, model=self.object._meta.model_name, pk=self.object.pk)
+            messages.info(self.request, f'Deleting "{self.object}" and {size["total"] - 1} related rows in the '
+                                        f'background ({reverse("job-status", args=[job.pk])}).')
+        else:
+            delete_tree(self.object)
+        return redirect(success_url)
+
+
+class JobAccessMixin(LoginRequiredMixin):
+    """Jobs are visible to staff and to whoever queued them."""
+
+    def get_job(self):
+        job = get_object_or_404(Job, pk=self.kwargs['pk'])
+        if not self.request.user.is_staff and job.created_by_id != self.request.user.pk:
+            raise Http404
+        return job
+
+
+class JobStatusView(JobAccessMixin, View):
+    def get(self, request, *args, **kwargs):
+        job = self.get_job()
+        return JsonResponse({
+            'id': job.pk, 'kind': job.kind, 'status': job.status, 'attempts': job.attempts,
+            'done': job.progress_done, 'total': job.progress_total, 'percent': job.progress_percent,
+            'message': job.message, 'error': job.error if job.status == Job.FAILED else '',
+        })
+
 
+class JobDownloadView(JobAccessMixin, View):
+    """The file written by an export job; 404 until it is done."""
 
-class CategoryListView(LoginRequiredMixin, ListView):
+    def get(self, request, *args, **kwargs):
+        job = self.get_job()
+        if job.status != Job.DONE or not (job.result or {}).get('path') or not os.path.exists(job.result['path']):
+            raise Http404
+        return FileResponse(open(job.result['path'], 'rb'), as_attachment=True, filename=job.result['filename'])
+
+
+class JobListView(StaffRequiredMixin, ListView):
+    """Recent jobs with their progress; POST queues a maintenance job."""
+    model = Job
+    queryset = Job.objects.select_related('created_by')
+    template_name = 'hanggarin/job_list.html'
+    context_object_name = 'jobs'
+    MAINTENANCE = {'recount': 'Recount task counters', 'rebuild_search_index': 'Rebuild search index'}
+
+    def get_queryset(self):
+        return super().get_queryset()[:100]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['maintenance'] = self.MAINTENANCE.items()
+        return context
+
+    def post(self, request, *args, **kwargs):
+        kind = request.POST.get('kind')
+        if kind in self.MAINTENANCE:
+            job = enqueue(kind, request.user)
+            messages.success(request, f'{self.MAINTENANCE[kind]} queued as job #{job.pk}.')
+        return redirect('job-list')
+
+
+class JobRetryView(StaffRequiredMixin, View):
+    def post(self, request, pk, *args, **kwargs):
+        updated = Job.objects.filter(pk=pk, status=Job.FAILED).update(
+            status=Job.QUEUED, attempts=0, run_after=timezone.now(), finished_at=None, updated_at=timezone.now(),
+        )
+        if updated:
+            messages.success(request, f'Job #{pk} queued again.')
+        return redirect('job-list')
+
+
+class CategoryListView(LoginRequiredMixin, ConditionalListMixin, CachedTableMixin, CursorPaginationMixin, ListView):
     model = Category
     context_object_name = 'categories'
     template_name = 'hanggarin/category_list.html'
+    table_template_name = 'hanggarin/_category_table.html'
+    cache_namespaces = ('category',)
     ordering = ['name']
+    allowed_sorts = ['name']
     paginate_by = 5
 
     def get_ordering(self):
-        allowed = ['name']
         sort_by = self.request.GET.get('sort_by')
-        if sort_by in allowed:
+        if sort_by in self.allowed_sorts:
             return sort_by
         return 'name'
 
@@ -84,24 +199,26 @@ class CategoryUpdateView(LoginRequiredMixin, UpdateView):
     paginate_by = 5
 
 
-class CategoryDeleteView(LoginRequiredMixin, DeleteView):
+class CategoryDeleteView(LoginRequiredMixin, TreeDeleteMixin, DeleteView):
     model = Category
     template_name = 'hanggarin/category_del.html'
     success_url = reverse_lazy('category-list')
     paginate_by = 5
 
 
-class PriorityListView(LoginRequiredMixin, ListView):
+class PriorityListView(LoginRequiredMixin, ConditionalListMixin, CachedTableMixin, CursorPaginationMixin, ListView):
     model = Priority
     context_object_name = 'priorities'
     template_name = 'hanggarin/priority_list.html'
+    table_template_name = 'hanggarin/_priority_table.html'
+    cache_namespaces = ('priority',)
     ordering = ['name']
+    allowed_sorts = ['name']
     paginate_by = 5
 
     def get_ordering(self):
-        allowed = ['name']
         sort_by = self.request.GET.get('sort_by')
-        if sort_by in allowed:
+        if sort_by in self.allowed_sorts:
             return sort_by
         return 'name'
 
@@ -135,7 +252,7 @@ class PriorityUpdateView(LoginRequiredMixin, UpdateView):
     paginate_by = 5
 
 
-class PriorityDeleteView(LoginRequiredMixin, DeleteView):
+class PriorityDeleteView(LoginRequiredMixin, TreeDeleteMixin, DeleteView):
     model = Priority
     template_name = 'hanggarin/priority_del.html'
     success_url = reverse_lazy('priority-list')
@@ -143,41 +260,49 @@ class PriorityDeleteView(LoginRequiredMixin, DeleteView):
 
 
 
-class TaskListView(LoginRequiredMixin, ListView):
+class TaskListView(LoginRequiredMixin, ConditionalListMixin, CachedTableMixin, CursorPaginationMixin, ListView):
     model = Task
+    queryset = Task.objects.annotate(progress=PROGRESS)
     context_object_name = 'tasks'
     template_name = 'hanggarin/task_list.html'
+    table_template_name = 'hanggarin/_task_table.html'
+    ranked_search = True
+    cache_namespaces = ('task', 'category', 'priority', 'subtask', 'note')
     ordering = ['category__name', 'priority__name', 'title']
+    allowed_sorts = [
+        'title',
+        'status',
+        'deadline',
+        'priority__name',
+        'category__name',
+        'created_at',
+        '-created_at',
+        'progress',
+        '-progress',
+    ]
     paginate_by = 5
 
     def get_ordering(self):
-        allowed = [
-            'title',
-            'status',
-            'deadline',
-            'priority__name',
-            'category__name',
-            'created_at',
-            '-created_at',
-        ]
         sort_by = self.request.GET.get('sort_by')
-        if sort_by in allowed:
+        if sort_by in self.allowed_sorts:
             return sort_by
+        if self.request.GET.get('q'):
+            return None
         return 'category__name'
 
     def get_queryset(self):
         qs = super().get_queryset().select_related('priority', 'category')
         q = self.request.GET.get('q')
         if q:
-            qs = qs.filter(
-                Q(title__icontains=q)
-                | Q(description__icontains=q)
-                | Q(status__icontains=q)
-                | Q(priority__name__icontains=q)
-                | Q(category__name__icontains=q)
-            )
+            # Without an explicit sort_by, matches come back best first.
+            qs = search(qs, q, ranked=self.ranked_search and self.get_ordering() is None)
         return qs
 
+    def get_page_context(self):
+        context = super().get_page_context()
+        context['bulk_form'] = BulkTaskForm()
+        return context
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['q'] = self.request.GET.get('q', '')
@@ -185,9 +310,129 @@ class TaskListView(LoginRequiredMixin, ListView):
         return context
 
 
+def list_queryset(view_class, params, **initkwargs):
+    """The unpaginated queryset ``view_class`` lists for ``params`` (q, sort_by)."""
+    request = HttpRequest()
+    request.GET = params
+    view = view_class(**initkwargs)
+    view.setup(request)
+    return view.get_queryset()
+
+
+def filtered_tasks(params):
+    return list_queryset(TaskListView, params)
+
+
+class TaskExportView(LoginRequiredMixin, View):
+    def get(self, request, *args, **kwargs):
+        fmt = request.GET.get('format', 'csv')
+        if fmt not in FORMATS:
+            return HttpResponseBadRequest(f'Unknown format; use one of {", ".join(FORMATS)}.')
+        compress = request.GET.get('gzip') in ('1', 'true')
+        response = StreamingHttpResponse(
+            export_tasks(filtered_tasks(request.GET), fmt, compress=compress),
+            content_type='application/gzip' if compress else f'{FORMATS[fmt]}; charset=utf-8',
+        )
+        filename = f'tasks.{fmt}' + ('.gz' if compress else '')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    def post(self, request, *args, **kwargs):
+        """Write the export in a background job; the file is then downloaded
+        from the job."""
+        fmt = request.POST.get('format', 'csv')
+        if fmt not in FORMATS:
+            return HttpResponseBadRequest(f'Unknown format; use one of {", ".join(FORMATS)}.')
+        params = {key: request.POST[key] for key in ('q', 'sort_by') if request.POST.get(key)}
+        job = enqueue('export_tasks', request.user, params=params, format=fmt,
+                      gzip=request.POST.get('gzip') in ('1', 'true'))
+        messages.info(request, f'Exporting tasks in the background; download it from '
+                               f'{reverse("job-download", args=[job.pk])} when done.')
+        url = reverse('task-list')
+        return redirect(f'{url}?{urlencode(params)}' if params else url)
+
+
+class BulkUpdateView(LoginRequiredMixin, View):
+    """POST-only endpoint applying one change to many rows of a list view.
+
+    ``scope=selected`` uses the posted ``ids``; ``scope=all`` takes everything
+    the list view would show for the posted ``q``.
+    """
+    form_class = None
+    list_view = None
+    success_url_name = None
+
+    def get_selection(self, form):
+        # Unranked: the selection becomes a pk subquery of the UPDATE.
+        queryset = list_queryset(self.list_view, self.request.POST, ranked_search=False)
+        if form.cleaned_data['scope'] == 'selected':
+            queryset = queryset.filter(pk__in=form.cleaned_data['ids'])
+        return queryset
+
+    def apply(self, queryset, form):
+        raise NotImplementedError
+
+    def post(self, request, *args, **kwargs):
+        form = self.form_class(request.POST)
+        if form.is_valid():
+            message = self.apply(self.get_selection(form), form)
+            if request.accepts('text/html'):
+                messages.success(request, message)
+            else:
+                return JsonResponse({'message': message})
+        else:
+            errors = ' '.join(error for errors in form.errors.values() for error in errors)
+            if not request.accepts('text/html'):
+                return JsonResponse({'errors': form.errors}, status=400)
+            messages.error(request, errors)
+        params = {key: request.POST[key] for key in ('q', 'sort_by') if request.POST.get(key)}
+        url = reverse(self.success_url_name)
+        return redirect(f'{url}?{urlencode(params)}' if params else url)
+
+
+class TaskBulkUpdateView(BulkUpdateView):
+    form_class = BulkTaskForm
+    list_view = TaskListView
+    success_url_name = 'task-list'
+
+    def apply(self, queryset, form):
+        data = form.cleaned_data
+        tasks, subtasks = update_tasks(
+            queryset, status=data['status'], priority=data['priority'], category=data['category'],
+            cascade=data['cascade'],
+        )
+        message = f'Updated {tasks} task(s).'
+        if subtasks:
+            message += f' Completed {subtasks} subtask(s).'
+        return message
+
+
+class TaskImportView(StaffRequiredMixin, FormView):
+    form_class = ImportForm
+    template_name = 'hanggarin/task_import.html'
+
+    def form_valid(self, form):
+        upload = form.cleaned_data['file']
+        if upload.size > settings.HANGGARIN_IMPORT_INLINE_BYTES:
+            # Spooled to the job files directory; the job deletes it when done.
+            # One attempt only: a retry would import the rows written so far again.
+            os.makedirs(settings.HANGGARIN_JOB_FILES_DIR, exist_ok=True)
+            fd, path = tempfile.mkstemp(suffix='.import', dir=settings.HANGGARIN_JOB_FILES_DIR)
+            with os.fdopen(fd, 'wb') as fh:
+                for chunk in upload.chunks():
+                    fh.write(chunk)
+            job = enqueue('import_tasks', self.request.user, max_attempts=1, path=path,
+                          format=form.cleaned_data['format'])
+            messages.info(self.request, f'Importing {upload.name} in the background (job #{job.pk}).')
+            return redirect('job-list')
+        stream = io.TextIOWrapper(upload.file, encoding='utf-8', newline='')
+        result = import_tasks(stream, form.cleaned_data['format'])
+        return self.render_to_response(self.get_context_data(form=ImportForm(), result=result))
+
+
 class TaskCreateView(LoginRequiredMixin, CreateView):
     model = Task
-    fields = ['title', 'description', 'status', 'deadline', 'priority', 'category']
+    form_class = TaskForm
     template_name = 'hanggarin/task_form.html'
     success_url = reverse_lazy('task-list')
     paginate_by = 5
@@ -195,13 +440,13 @@ class TaskCreateView(LoginRequiredMixin, CreateView):
 
 class TaskUpdateView(LoginRequiredMixin, UpdateView):
     model = Task
-    fields = ['title', 'description', 'status', 'deadline', 'priority', 'category']
+    form_class = TaskForm
     template_name = 'hanggarin/task_form.html'
     success_url = reverse_lazy('task-list')
     paginate_by = 5
 
 
-class TaskDeleteView(LoginRequiredMixin, DeleteView):
+class TaskDeleteView(LoginRequiredMixin, TreeDeleteMixin, DeleteView):
     model = Task
     template_name = 'hanggarin/task_del.html'
     success_url = reverse_lazy('task-list')
@@ -209,35 +454,43 @@ class TaskDeleteView(LoginRequiredMixin, DeleteView):
 
 
 
-class SubTaskListView(LoginRequiredMixin, ListView):
+class SubTaskListView(LoginRequiredMixin, ConditionalListMixin, CachedTableMixin, CursorPaginationMixin, ListView):
     model = SubTask
     context_object_name = 'subtasks'
     template_name = 'hanggarin/subtask_list.html'
+    table_template_name = 'hanggarin/_subtask_table.html'
+    ranked_search = True
+    cache_namespaces = ('subtask', 'task')
     ordering = ['-created_at']
+    allowed_sorts = [
+        'task__title',
+        'title',
+        'status',
+        'created_at',
+        '-created_at',
+    ]
     paginate_by = 5
 
     def get_ordering(self):
-        allowed = [
-            'task__title',
-            'title',
-            'status',
-            'created_at',
-            '-created_at',
-        ]
         sort_by = self.request.GET.get('sort_by')
-        if sort_by in allowed:
+        if sort_by in self.allowed_sorts:
             return sort_by
+        if self.request.GET.get('q'):
+            return None
         return '-created_at'
 
     def get_queryset(self):
         qs = super().get_queryset().select_related('task')
         q = self.request.GET.get('q')
         if q:
-            qs = qs.filter(
-                Q(title__icontains=q) | Q(status__icontains=q) | Q(task__title__icontains=q)
-            )
+            qs = search(qs, q, ranked=self.ranked_search and self.get_ordering() is None)
         return qs
 
+    def get_page_context(self):
+        context = super().get_page_context()
+        context['bulk_form'] = BulkSubTaskForm()
+        return context
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['q'] = self.request.GET.get('q', '')
@@ -245,9 +498,18 @@ class SubTaskListView(LoginRequiredMixin, ListView):
         return context
 
 
+class SubTaskBulkUpdateView(BulkUpdateView):
+    form_class = BulkSubTaskForm
+    list_view = SubTaskListView
+    success_url_name = 'subtask-list'
+
+    def apply(self, queryset, form):
+        return f'Updated {update_subtasks(queryset, form.cleaned_data["status"])} subtask(s).'
+
+
 class SubTaskCreateView(LoginRequiredMixin, CreateView):
     model = SubTask
-    fields = ['task', 'title', 'status']
+    form_class = SubTaskForm
     template_name = 'hanggarin/subtask_form.html'
     success_url = reverse_lazy('subtask-list')
     paginate_by = 5
@@ -255,7 +517,7 @@ class SubTaskCreateView(LoginRequiredMixin, CreateView):
 
 class SubTaskUpdateView(LoginRequiredMixin, UpdateView):
     model = SubTask
-    fields = ['task', 'title', 'status']
+    form_class = SubTaskForm
     template_name = 'hanggarin/subtask_form.html'
     success_url = reverse_lazy('subtask-list')
     paginate_by = 5
@@ -269,30 +531,35 @@ class SubTaskDeleteView(LoginRequiredMixin, DeleteView):
 
 
 
-class NoteListView(LoginRequiredMixin, ListView):
+class NoteListView(LoginRequiredMixin, ConditionalListMixin, CachedTableMixin, CursorPaginationMixin, ListView):
     model = Note
     context_object_name = 'notes'
     template_name = 'hanggarin/note_list.html'
+    table_template_name = 'hanggarin/_note_table.html'
+    ranked_search = True
+    cache_namespaces = ('note', 'task')
     ordering = ['-created_at']
+    allowed_sorts = [
+        'task__title',
+        'content',
+        'created_at',
+        '-created_at',
+    ]
     paginate_by = 5
 
     def get_ordering(self):
-        allowed = [
-            'task__title',
-            'content',
-            'created_at',
-            '-created_at',
-        ]
         sort_by = self.request.GET.get('sort_by')
-        if sort_by in allowed:
+        if sort_by in self.allowed_sorts:
             return sort_by
+        if self.request.GET.get('q'):
+            return None
         return '-created_at'
 
     def get_queryset(self):
         qs = super().get_queryset().select_related('task')
         q = self.request.GET.get('q')
         if q:
-            qs = qs.filter(Q(content__icontains=q) | Q(task__title__icontains=q))
+            qs = search(qs, q, ranked=self.ranked_search and self.get_ordering() is None)
         return qs
 
     def get_context_data(self, **kwargs):
@@ -304,20 +571,115 @@ class NoteListView(LoginRequiredMixin, ListView):
 
 class NoteCreateView(LoginRequiredMixin, CreateView):
     model = Note
-    fields = ['task', 'content']
+    form_class = NoteForm
     template_name = 'hanggarin/note_form.html'
     success_url = reverse_lazy('note-list')
     paginate_by = 5
 
 class NoteUpdateView(LoginRequiredMixin, UpdateView):
     model = Note
-    fields = ['task', 'content']
+    queryset = Note.objects.select_related('task')
+    form_class = NoteForm
     template_name = 'hanggarin/note_form.html'
     success_url = reverse_lazy('note-list')
     paginate_by = 5
 
 class NoteDeleteView(LoginRequiredMixin, DeleteView):
     model = Note
+    queryset = Note.objects.select_related('task')
     template_name = 'hanggarin/note_del.html'
     success_url = reverse_lazy('note-list')
     paginate_by = 5
+
+
+class AutocompleteView(LoginRequiredMixin, View):
+    """JSON options for the AutocompleteSelect widget, ``limit`` rows per page."""
+    model = None
+    search_field = 'name'
+    limit = 20
+
+    def get_queryset(self, term):
+        key = Lower(self.search_field)
+        queryset = self.model.objects.only('id', self.search_field).alias(key=key)
+        if term.isascii():
+            if term:
+                # A range on the lower() index: LIKE (istartswith) cannot be
+                # served from an index on either SQLite or Postgres.
+                term = term.lower()
+                queryset = queryset.filter(key__gte=term, key__lt=term[:-1] + chr(ord(term[-1]) + 1))
+        else:
+            # Python and the database disagree on lowering non-ASCII (SQLite's
+            # lower() leaves it alone), so let the database match it.
+            queryset = queryset.filter(**{f'{self.search_field}__istartswith': term})
+        return queryset.order_by(key, 'pk')
+
+    def get(self, request, *args, **kwargs):
+        term = request.GET.get('q', '').strip()
+        try:
+            page = max(int(request.GET.get('page', 1)), 1)
+        except ValueError:
+            page = 1
+        offset = (page - 1) * self.limit
+        rows = list(self.get_queryset(term)[offset:offset + self.limit + 1])
+        return JsonResponse({
+            'results': [{'id': obj.pk, 'text': str(obj)} for obj in rows[:self.limit]],
+            'more': len(rows) > self.limit,
+        })
+
+
+class CategoryAutocompleteView(AutocompleteView):
+    model = Category
+
+
+class PriorityAutocompleteView(AutocompleteView):
+    model = Priority
+
+
+class TaskAutocompleteView(AutocompleteView):
+    model = Task
+    search_field = 'title'
+
+
+@method_decorator([gzip_page, never_cache], name='dispatch')
+class SyncView(LoginRequiredMixin, View):
+    """Delta sync for the PWA: the changes after ``cursor``, one batch per call.
+
+    Rows come as ``{"fields": [...], "rows": [[...], ...]}`` per model and
+    deletions as ids per model; apply the rows, then the deletions, then store
+    ``cursor`` and call again while ``more`` is true. 410 asks for a full resync.
+    """
+    raise_exception = True
+
+    def get(self, request, *args, **kwargs):
+        try:
+            limit = min(max(int(request.GET['limit']), 1), settings.HANGGARIN_SYNC_MAX_BATCH_SIZE)
+        except (KeyError, ValueError):
+            limit = settings.HANGGARIN_SYNC_BATCH_SIZE
+        try:
+            cursor = decode_cursor(request.GET.get('cursor', ''))
+            batch = changes_since(cursor, limit)
+        except CursorExpired as exc:
+            return JsonResponse({'error': str(exc), 'reset': True}, status=410)
+        except ValueError as exc:
+            return JsonResponse({'error': str(exc)}, status=400)
+        return JsonResponse(batch, json_dumps_params={'separators': (',', ':')})
+
+
+class ServiceWorkerView(TemplateView):
+    """The PWA service worker, rendered with this deploy's (hashed) asset URLs.
+
+    Browsers revalidate it on every navigation; the ETag is the worker version,
+    so an unchanged deploy costs a 304.
+    """
+    template_name = SERVICE_WORKER_TEMPLATE
+    content_type = 'application/javascript'
+
+    def get(self, request, *args, **kwargs):
+        context = service_worker_context()
+        etag = quote_etag(context['version'])
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = self.render_to_response(context)
+        response.headers['ETag'] = etag
+        patch_cache_control(response, no_cache=True)
+        return response
@@ -0,0 +1,36 @@
+from django import forms
+from django.urls import reverse
+
+
+class AutocompleteSelect(forms.Select):
+    """Select that only renders the chosen option and fetches the rest as JSON.
+
+    ``static/js/autocomplete.js`` adds a search box that queries the endpoint
+    named by ``url_name`` and swaps the results into the select.
+    """
+
+    def __init__(self, url_name, attrs=None):
+        super().__init__(attrs)
+        self.url_name = url_name
+
+    class Media:
+        js = ['js/autocomplete.js']
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs['data-autocomplete-url'] = reverse(self.url_name)
+        return attrs
+
+    def optgroups(self, name, value, attrs=None):
+        # Same idea as the admin's AutocompleteMixin: never iterate the whole
+        # queryset, only look up the currently selected rows.
+        field = self.choices.field
+        selected = [v for v in value if v not in (None, '') and str(v).isdigit()]
+        choices = [('', field.empty_label or '')]
+        if selected:
+            choices += [(obj.pk, field.label_from_instance(obj)) for obj in self.choices.queryset.filter(pk__in=selected)]
+        selected = {str(v) for v in selected}
+        return [
+            (None, [self.create_option(name, pk, label, str(pk) in selected, index, attrs=attrs)], index)
+            for index, (pk, label) in enumerate(choices)
+        ]
@@ -12,5 +12,9 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'projectsite.settings')
+os.environ.setdefault('HANGGARIN_ASYNC_VIEWS', '1')
+# Connections belong to a single request under ASGI, so persistent ones would
+# leak; use DB_POOL (Postgres) for reuse instead.
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
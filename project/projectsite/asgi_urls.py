@@ -0,0 +1,24 @@
+"""URLs for ASGI deployments (HANGGARIN_ASYNC_VIEWS): projectsite.urls with the
+dashboard and list views swapped for their async-native versions."""
+from django.urls import path
+
+from HanggarinApp.async_views import (
+    AsyncHomePageView, AsyncCategoryListView, AsyncPriorityListView, AsyncTaskListView, AsyncSubTaskListView,
+    AsyncNoteListView,
+)
+from projectsite.urls import urlpatterns as sync_urlpatterns
+
+ASYNC_VIEWS = {
+    'home': AsyncHomePageView,
+    'category-list': AsyncCategoryListView,
+    'priority-list': AsyncPriorityListView,
+    'task-list': AsyncTaskListView,
+    'subtask-list': AsyncSubTaskListView,
+    'note-list': AsyncNoteListView,
+}
+
+urlpatterns = [
+    path(str(pattern.pattern), ASYNC_VIEWS[pattern.name].as_view(), name=pattern.name)
+    if getattr(pattern, 'name', None) in ASYNC_VIEWS else pattern
+    for pattern in sync_urlpatterns
+]
@@ -18,18 +18,29 @@ from django.contrib import admin
 from django.urls import path, include
 from django.urls import path, include
 from HanggarinApp.views import (
-    HomePageView, CategoryListView, CategoryCreateView, CategoryUpdateView, CategoryDeleteView,
+    HomePageView, PerfSummaryView, CategoryListView, CategoryCreateView, CategoryUpdateView, CategoryDeleteView,
     PriorityListView, PriorityCreateView, PriorityUpdateView, PriorityDeleteView,
-    TaskListView, TaskCreateView, TaskUpdateView, TaskDeleteView,
-    SubTaskListView, SubTaskCreateView, SubTaskUpdateView, SubTaskDeleteView,
-    NoteListView, NoteCreateView, NoteUpdateView, NoteDeleteView
+    TaskListView, TaskBulkUpdateView, TaskExportView, TaskImportView, TaskCreateView, TaskUpdateView, TaskDeleteView,
+    SubTaskListView, SubTaskBulkUpdateView, SubTaskCreateView, SubTaskUpdateView, SubTaskDeleteView,
+    NoteListView, NoteCreateView, NoteUpdateView, NoteDeleteView,
+    CategoryAutocompleteView, PriorityAutocompleteView, TaskAutocompleteView, SyncView,
+    ServiceWorkerView, JobListView, JobStatusView, JobRetryView, JobDownloadView,
 )
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    # Ahead of pwa.urls, which would serve a static worker file.
+    path('serviceworker.js', ServiceWorkerView.as_view(), name='serviceworker'),
     path('', include('pwa.urls')),
     path('accounts/', include('allauth.urls')),  # allauth routes
     path('', HomePageView.as_view(), name='home'),
+    path('perf/', PerfSummaryView.as_view(), name='perf-summary'),
+
+    # Background jobs
+    path('jobs/', JobListView.as_view(), name='job-list'),
+    path('jobs/<int:pk>/', JobStatusView.as_view(), name='job-status'),
+    path('jobs/<int:pk>/retry/', JobRetryView.as_view(), name='job-retry'),
+    path('jobs/<int:pk>/download/', JobDownloadView.as_view(), name='job-download'),
     
     # Category URLs
     path('categories/', CategoryListView.as_view(), name='category-list'),
@@ -46,12 +57,16 @@ urlpatterns = [
     # Task URLs
     path('tasks/', TaskListView.as_view(), name='task-list'),
     path('tasks/add/', TaskCreateView.as_view(), name='task-add'),
+    path('tasks/export/', TaskExportView.as_view(), name='task-export'),
+    path('tasks/import/', TaskImportView.as_view(), name='task-import'),
+    path('tasks/bulk/', TaskBulkUpdateView.as_view(), name='task-bulk'),
     path('tasks/<int:pk>/', TaskUpdateView.as_view(), name='task-update'),
     path('tasks/<int:pk>/delete/', TaskDeleteView.as_view(), name='task-delete'),
     
     # SubTask URLs
     path('subtasks/', SubTaskListView.as_view(), name='subtask-list'),
     path('subtasks/add/', SubTaskCreateView.as_view(), name='subtask-add'),
+    path('subtasks/bulk/', SubTaskBulkUpdateView.as_view(), name='subtask-bulk'),
     path('subtasks/<int:pk>/', SubTaskUpdateView.as_view(), name='subtask-update'),
     path('subtasks/<int:pk>/delete/', SubTaskDeleteView.as_view(), name='subtask-delete'),
     
@@ -60,4 +75,12 @@ urlpatterns = [
     path('notes/add/', NoteCreateView.as_view(), name='note-add'),
     path('notes/<int:pk>/', NoteUpdateView.as_view(), name='note-update'),
     path('notes/<int:pk>/delete/', NoteDeleteView.as_view(), name='note-delete'),
+
+    # Autocomplete URLs
+    path('autocomplete/categories/', CategoryAutocompleteView.as_view(), name='category-autocomplete'),
+    path('autocomplete/priorities/', PriorityAutocompleteView.as_view(), name='priority-autocomplete'),
+    path('autocomplete/tasks/', TaskAutocompleteView.as_view(), name='task-autocomplete'),
+
+    # Delta sync for the PWA client
+    path('api/sync/', SyncView.as_view(), name='sync'),
 ]
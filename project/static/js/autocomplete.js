@@ -0,0 +1,77 @@
+// Search-as-you-type for selects rendered by HanggarinApp.widgets.AutocompleteSelect.
+// The server only renders the selected option; matches are fetched as JSON.
+(function () {
+  'use strict';
+
+  var DELAY = 250;
+
+  function setOptions(select, results, more) {
+    var current = select.value;
+    var kept = null;
+    Array.prototype.slice.call(select.options).forEach(function (option) {
+      if (option.value === '') {
+        return;
+      }
+      if (option.value === current) {
+        kept = option;
+      }
+      select.removeChild(option);
+    });
+    if (kept) {
+      select.appendChild(kept);
+    }
+    results.forEach(function (row) {
+      if (String(row.id) === current) {
+        return;
+      }
+      var option = document.createElement('option');
+      option.value = row.id;
+      option.textContent = row.text;
+      select.appendChild(option);
+    });
+    if (more) {
+      var hint = document.createElement('option');
+      hint.disabled = true;
+      hint.textContent = 'Keep typing to narrow the results…';
+      select.appendChild(hint);
+    }
+  }
+
+  function attach(select) {
+    var input = document.createElement('input');
+    var timer = null;
+    var last = null;
+    input.type = 'search';
+    input.className = 'form-control mb-1';
+    input.placeholder = 'Type to search…';
+    input.setAttribute('autocomplete', 'off');
+    select.parentNode.insertBefore(input, select);
+
+    function load() {
+      var term = input.value.trim();
+      if (term === last) {
+        return;
+      }
+      last = term;
+      var url = select.getAttribute('data-autocomplete-url') + '?q=' + encodeURIComponent(term);
+      fetch(url, {credentials: 'same-origin', headers: {'Accept': 'application/json'}})
+        .then(function (resp) { return resp.ok ? resp.json() : {results: [], more: false}; })
+        .then(function (data) {
+          if (term === last) {
+            setOptions(select, data.results, data.more);
+          }
+        });
+    }
+
+    input.addEventListener('input', function () {
+      clearTimeout(timer);
+      timer = setTimeout(load, DELAY);
+    });
+    input.addEventListener('focus', load);
+    select.addEventListener('focus', load);
+  }
+
+  document.addEventListener('DOMContentLoaded', function () {
+    Array.prototype.forEach.call(document.querySelectorAll('select[data-autocomplete-url]'), attach);
+  });
+})();
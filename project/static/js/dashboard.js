@@ -0,0 +1,42 @@
+// Trend chart on the dashboard; the series come from the rollups through
+// the json_script in home.html (HanggarinApp.rollups.trends).
+$(function () {
+	var source = document.getElementById('dashboard-trends');
+	if (!source || typeof Chartist === 'undefined') {
+		return;
+	}
+	var trends = JSON.parse(source.textContent);
+
+	function render(days) {
+		var data = trends[days];
+		// Label roughly a dozen points whatever the range.
+		var every = Math.ceil(data.labels.length / 12);
+		new Chartist.Line('#trendChart', {
+			labels: data.labels,
+			series: [
+				{ name: 'Created', data: data.created },
+				{ name: 'Completed', data: data.completed },
+				{ name: 'Overdue', data: data.overdue }
+			]
+		}, {
+			plugins: [Chartist.plugins.tooltip()],
+			low: 0,
+			height: '245px',
+			showPoint: data.labels.length <= 60,
+			axisX: {
+				showGrid: false,
+				labelInterpolationFnc: function (label, index) {
+					return index % every === 0 ? label.slice(5) : null;
+				}
+			},
+			axisY: { onlyInteger: true }
+		});
+	}
+
+	$('[data-trend-days]').on('click', function () {
+		$('[data-trend-days]').removeClass('active');
+		$(this).addClass('active');
+		render($(this).data('trend-days'));
+	});
+	render($('[data-trend-days].active').data('trend-days') || 30);
+});
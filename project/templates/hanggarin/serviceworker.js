@@ -0,0 +1,138 @@
+// Generated by HanggarinApp.views.ServiceWorkerView; edit this template, not a copy.
+const VERSION = '{{ version }}';
+const CONFIG = {{ config|safe }};
+const PRECACHE = 'hanggarin-precache-' + VERSION;
+const RUNTIME = {
+  static: 'hanggarin-static-' + VERSION,
+  pages: 'hanggarin-pages-' + VERSION,
+  forms: 'hanggarin-forms-' + VERSION,
+};
+const CURRENT = [PRECACHE, RUNTIME.static, RUNTIME.pages, RUNTIME.forms];
+
+self.addEventListener('install', function (event) {
+  event.waitUntil(
+    caches.open(PRECACHE)
+      .then(function (cache) {
+        // Bypass the HTTP cache so a new version never precaches stale files.
+        return cache.addAll(CONFIG.precache.map(function (url) {
+          return new Request(url, { cache: 'reload', credentials: 'same-origin' });
+        }));
+      })
+      .then(function () { return self.skipWaiting(); })
+  );
+});
+
+self.addEventListener('activate', function (event) {
+  event.waitUntil(
+    caches.keys()
+      .then(function (names) {
+        return Promise.all(names.filter(function (name) {
+          // Earlier versions, and the hand-written worker's single cache.
+          return (name.startsWith('hanggarin-') || name.startsWith('projectsite-cache-')) && !CURRENT.includes(name);
+        }).map(function (name) { return caches.delete(name); }));
+      })
+      .then(function () { return self.clients.claim(); })
+  );
+});
+
+// Cache API keys iterate in insertion order, so re-putting an entry on use
+// and evicting from the front keeps each runtime cache a bounded LRU.
+function remember(cacheName, request, response) {
+  if (!response || !response.ok || response.redirected || response.type !== 'basic') {
+    return Promise.resolve();
+  }
+  return caches.open(cacheName).then(function (cache) {
+    return cache.delete(request)
+      .then(function () { return cache.put(request, response); })
+      .then(function () { return cache.keys(); })
+      .then(function (keys) {
+        const excess = keys.length - CONFIG.limits[cacheName.split('-')[1]];
+        return Promise.all(keys.slice(0, Math.max(excess, 0)).map(function (key) { return cache.delete(key); }));
+      });
+  });
+}
+
+function offline(request) {
+  if (request.mode !== 'navigate') {
+    return Response.error();
+  }
+  return caches.match(CONFIG.offline).then(function (page) { return page || Response.error(); });
+}
+
+// Hashed assets never change under one name: serve from cache, fetch once.
+function cacheFirst(event, cacheName) {
+  return caches.match(event.request).then(function (cached) {
+    if (cached) {
+      if (!CONFIG.precache.includes(new URL(event.request.url).pathname)) {
+        event.waitUntil(remember(cacheName, event.request, cached.clone()));
+      }
+      return cached;
+    }
+    return fetch(event.request).then(function (response) {
+      event.waitUntil(remember(cacheName, event.request, response.clone()));
+      return response;
+    });
+  });
+}
+
+// List pages render at once from cache; the fetch (a conditional GET against
+// the list ETags) refreshes the entry for the next visit. A write clears the
+// cache first, so the list it redirects to comes from the network, with its
+// change and flash message.
+function staleWhileRevalidate(event, cacheName) {
+  return cleared.then(function () {
+    const network = fetch(event.request).then(function (response) {
+      return remember(cacheName, event.request, response.clone()).then(function () { return response; });
+    });
+    event.waitUntil(network.catch(function () {}));
+    return caches.match(event.request).then(function (cached) {
+      return cached || network.catch(function () { return offline(event.request); });
+    });
+  });
+}
+
+// Forms and everything else want fresh HTML (CSRF tokens, current values);
+// the cached copy is only an offline fallback.
+function networkFirst(event, cacheName) {
+  return fetch(event.request)
+    .then(function (response) {
+      event.waitUntil(remember(cacheName, event.request, response.clone()));
+      return response;
+    })
+    .catch(function () {
+      return caches.match(event.request).then(function (cached) { return cached || offline(event.request); });
+    });
+}
+
+// Settles once the runtime caches cleared by the latest write are gone.
+let cleared = Promise.resolve();
+
+function clearRuntimeCaches() {
+  cleared = Promise.all([RUNTIME.pages, RUNTIME.forms].map(function (name) { return caches.delete(name); }));
+  return cleared;
+}
+
+self.addEventListener('fetch', function (event) {
+  const request = event.request;
+  const url = new URL(request.url);
+  if (url.origin !== self.location.origin) {
+    return;
+  }
+  const networkOnly = CONFIG.network.some(function (prefix) { return url.pathname.startsWith(prefix); });
+  if (request.method !== 'GET') {
+    // Any write (or login/logout) outdates the cached pages: lists would miss
+    // the change, and pages cached for one account must not reach the next.
+    event.waitUntil(clearRuntimeCaches());
+    return;
+  }
+  if (networkOnly) {
+    return;
+  }
+  if (url.pathname.startsWith(CONFIG.static)) {
+    event.respondWith(cacheFirst(event, RUNTIME.static));
+  } else if (CONFIG.lists.includes(url.pathname)) {
+    event.respondWith(staleWhileRevalidate(event, RUNTIME.pages));
+  } else if (request.mode === 'navigate' || (request.headers.get('Accept') || '').includes('text/html')) {
+    event.respondWith(networkFirst(event, RUNTIME.forms));
+  }
+});